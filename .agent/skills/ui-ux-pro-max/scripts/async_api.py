@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Async API - asyncio entry points for search and design system generation.
+
+Scoring, CSV/index loading and file writes run on a managed thread pool, so
+the event loop is never blocked; the independent domain searches of a design
+system (and of its page overrides) are awaited concurrently. The number of
+pool threads and of operations in flight per event loop are configurable.
+
+Usage:
+    from async_api import asearch, asearch_stack, agenerate_design_system, configure
+    configure(max_workers=8, max_concurrency=32)   # optional; also UIPRO_ASYNC_WORKERS / UIPRO_ASYNC_CONCURRENCY
+    result = await asearch("glassmorphism", "style")
+    text = await agenerate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import weakref
+
+from core import MAX_RESULTS, PARALLEL_WORKERS, make_executor, search, search_all, search_stack
+from design_system import (
+    OVERRIDE_SEARCHES, _override_context, format_ascii_box, format_markdown, get_generator, persist_design_system
+)
+
+
+# ============ CONFIGURATION ============
+MAX_WORKERS = int(os.environ.get("UIPRO_ASYNC_WORKERS", "0")) or PARALLEL_WORKERS
+MAX_CONCURRENCY = int(os.environ.get("UIPRO_ASYNC_CONCURRENCY", "0")) or 4 * MAX_WORKERS
+
+_pool = None
+_pool_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()  # event loop -> Semaphore(MAX_CONCURRENCY)
+
+
+def configure(max_workers: int = None, max_concurrency: int = None):
+    """Resize the worker pool and/or the per-loop limit on offloaded operations in flight."""
+    global MAX_WORKERS, MAX_CONCURRENCY, _pool
+    with _pool_lock:
+        if max_workers is not None and max_workers != MAX_WORKERS:
+            MAX_WORKERS = max_workers
+            if _pool is not None:
+                _pool.shutdown(wait=False)  # Running calls finish; new ones use the new pool
+                _pool = None
+        if max_concurrency is not None:
+            MAX_CONCURRENCY = max_concurrency
+            _semaphores.clear()
+
+
+def shutdown(wait: bool = True):
+    """Stop the worker pool (it is recreated on the next call)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = make_executor(MAX_WORKERS)
+        return _pool
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return semaphore
+
+
+async def _offload(fn, *args, **kwargs):
+    """Run fn on the worker pool, waiting for a slot when MAX_CONCURRENCY calls are in flight."""
+    async with _semaphore():
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), functools.partial(fn, *args, **kwargs))
+
+
+# ============ SEARCH ============
+async def asearch(query: str, domain: str = None, max_results: int = MAX_RESULTS) -> dict:
+    """Async search(): same arguments and result."""
+    return await _offload(search, query, domain, max_results)
+
+
+async def asearch_stack(query: str, stack: str, max_results: int = MAX_RESULTS) -> dict:
+    """Async search_stack(): same arguments and result."""
+    return await _offload(search_stack, query, stack, max_results)
+
+
+async def asearch_all(query: str, max_results: int = MAX_RESULTS, include_stacks: bool = False) -> dict:
+    """Async search_all(): same arguments and result."""
+    return await _offload(search_all, query, max_results, include_stacks)
+
+
+async def _gather_searches(jobs: dict) -> dict:
+    """Run {key: search() args} concurrently and return {key: result}."""
+    results = await asyncio.gather(*(asearch(*args) for args in jobs.values()))
+    return dict(zip(jobs, results))
+
+
+# ============ DESIGN SYSTEM ============
+async def agenerate_design_system(query: str, project_name: str = None, output_format: str = "ascii",
+                                  persist: bool = False, page: str = None, output_dir: str = None) -> str:
+    """
+    Async generate_design_system(): same arguments and output.
+
+    The product search decides the reasoning rule; the remaining domain
+    searches, and the page override searches when persisting a page, then
+    run concurrently.
+    """
+    generator = await _offload(get_generator)  # Only stats ui-reasoning.csv
+    # The rules are read and indexed on first access: do that on the pool, not on the event loop
+    await _offload(getattr, generator, "reasoning_data")
+    product_result = await asearch(query, "product", 1)
+    category = generator._category(product_result)
+    reasoning = generator._apply_reasoning(category, {})
+
+    search_results = await _gather_searches(generator._search_jobs(query, reasoning.get("style_priority", [])))
+    search_results["product"] = product_result
+    design_system = generator._build_design_system(query, project_name, category, reasoning, search_results)
+
+    if persist:
+        page_searches = None
+        if page:
+            context = _override_context(page, query)
+            page_searches = await _gather_searches(
+                {domain: (context, domain, n) for domain, n in OVERRIDE_SEARCHES.items()})
+        await _offload(persist_design_system, design_system, page, output_dir, query, page_searches)
+
+    formatter = format_markdown if output_format == "markdown" else format_ascii_box
+    return await _offload(formatter, design_system)
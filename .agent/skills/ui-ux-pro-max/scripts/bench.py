@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks - Reproducible workloads for the search and design-system hot paths.
+
+Reports p50/p95 latency, throughput and peak traced memory per workload as
+JSON with stable keys, so two runs can be diffed or compared directly.
+
+Usage:
+    python bench.py                           # Full suite, JSON to stdout
+    python bench.py -o before.json            # Save a baseline
+    python bench.py --compare before.json     # Run again and print p50/p95 deltas
+    python bench.py --only search,fit --iterations 20 --scales 1,10
+    python bench.py --only startup            # Import time per entry module vs IMPORT_BUDGET_MS
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import core
+from core import CSV_CONFIG, STACK_CONFIG, DATA_DIR, FEDERATED_DOMAIN, _load_csv, _new_index, clear_cache, search, search_stack
+
+
+# ============ CONFIGURATION ============
+SEED = 1337
+DEFAULT_ITERATIONS = 50
+DEFAULT_SCALES = [1, 10, 100]
+
+QUERY_MIX = [
+    "dashboard dark mode", "form accessibility", "saas landing page hero", "glassmorphism modern",
+    "luxury serif elegant", "fintech crypto trust", "trend over time chart", "mobile touch targets",
+    "button hover animation", "beauty spa wellness", "react memo rerender", "aria focus outline",
+    "e-commerce product grid", "healthcare calm blue", "image lazy loading", "keyboard navigation",
+]
+
+WORKLOADS = ["search", "stack", "fit", "score", "design_system", "startup"]
+
+# Cumulative `python -X importtime` budget per entry module; agent tool calls pay it on every invocation
+IMPORT_BUDGET_MS = {"core": 30.0, "search": 45.0, "design_system": 40.0}
+SCRIPTS_DIR = Path(__file__).parent
+
+
+# ============ MEASUREMENT ============
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def measure(fn, args_list: list, setup=None) -> dict:
+    """
+    Time fn(*args) for every entry of args_list, then trace one extra run for peak memory.
+
+    setup, if given, runs before every call and is excluded from the timings.
+    """
+    timings = []
+    for args in args_list:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn(*args_list[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(_summarize(timings), peak_kb=round(peak / 1024, 1))
+
+
+def _summarize(timings: list) -> dict:
+    """Latency percentiles and throughput of a list of durations in seconds."""
+    timings = sorted(timings)
+    total = sum(timings)
+    return {
+        "n": len(timings),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 4),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 4),
+        "mean_ms": round(total / len(timings) * 1000, 4),
+        "ops_per_s": round(len(timings) / total, 2) if total else 0.0,
+    }
+
+
+def _queries(rng: random.Random, iterations: int) -> list:
+    return [rng.choice(QUERY_MIX) for _ in range(iterations)]
+
+
+def _synthetic_corpus(scale: int) -> list:
+    """Documents from every shipped domain CSV, replicated scale times."""
+    documents = []
+    for config in CSV_CONFIG.values():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            documents += [" ".join(str(row.get(col, "")) for col in config["search_cols"])
+                          for row in _load_csv(filepath)]
+    return documents * scale
+
+
+# ============ WORKLOADS ============
+def bench_search(rng, iterations):
+    results = {}
+    for domain in CSV_CONFIG:
+        queries = [(q, domain) for q in _queries(rng, iterations)]
+        results[f"search.cold.{domain}"] = measure(search, queries[:max(3, iterations // 10)], setup=clear_cache)
+        search(queries[0][0], domain)
+        results[f"search.warm.{domain}"] = measure(search, queries)
+    results["search.warm.auto_domain"] = measure(search, [(q,) for q in _queries(rng, iterations)])
+    queries = [(q, FEDERATED_DOMAIN) for q in _queries(rng, iterations)]
+    results["search.cold.all"] = measure(search, queries[:max(3, iterations // 10)], setup=clear_cache)
+    results["search.warm.all"] = measure(search, queries)
+
+    # Repeated queries answered from the result cache (disabled for the workloads above)
+    saved_size, core.RESULT_CACHE_SIZE = core.RESULT_CACHE_SIZE, max(core.RESULT_CACHE_SIZE, len(QUERY_MIX))
+    queries = [(q,) for q in _queries(rng, iterations)]
+    for query in QUERY_MIX:
+        search(query)
+    results["search.result_cache_hit"] = measure(search, queries)
+    core.RESULT_CACHE_SIZE = saved_size
+    return results
+
+
+def bench_stack(rng, iterations):
+    results = {}
+    for stack in STACK_CONFIG:
+        queries = [(q, stack) for q in _queries(rng, iterations)]
+        results[f"stack.cold.{stack}"] = measure(search_stack, queries[:max(3, iterations // 10)], setup=clear_cache)
+        search_stack(queries[0][0], stack)
+        results[f"stack.warm.{stack}"] = measure(search_stack, queries)
+    return results
+
+
+def bench_fit(rng, iterations, scales):
+    results = {}
+    for scale in scales:
+        documents = _synthetic_corpus(scale)
+        runs = max(3, iterations // (10 * scale))
+        results[f"fit.x{scale}"] = measure(lambda docs: _new_index(len(docs)).fit(docs), [(documents,)] * runs)
+        results[f"fit.x{scale}"]["docs"] = len(documents)
+    return results
+
+
+def bench_score(rng, iterations, scales):
+    results = {}
+    for scale in scales:
+        documents = _synthetic_corpus(scale)
+        index = _new_index(len(documents))
+        index.fit(documents)
+        queries = [(q, core.MAX_RESULTS) for q in _queries(rng, iterations)]
+        results[f"top_k.x{scale}"] = measure(index.top_k, queries)
+        results[f"score_all.x{scale}"] = measure(index.score, [(q,) for q, _ in queries[:max(3, iterations // scale)]])
+        results[f"top_k.x{scale}"]["docs"] = len(documents)
+    return results
+
+
+def bench_design_system(rng, iterations):
+    from design_system import DesignSystemGenerator
+
+    results = {}
+    queries = [(q,) for q in _queries(rng, max(3, iterations // 5))]
+    results["generate.cold"] = measure(lambda q: DesignSystemGenerator().generate(q), queries[:3], setup=clear_cache)
+    generator = DesignSystemGenerator()
+    generator.generate(queries[0][0])
+    results["generate.warm"] = measure(generator.generate, queries)
+    return results
+
+
+def _import_seconds(module: str) -> float:
+    """Cumulative import time of module in a fresh interpreter, from python -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True)
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2] == f" {module}":
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def bench_startup(rng, iterations):
+    results = {}
+    runs = max(3, iterations // 10)
+    for module, budget in IMPORT_BUDGET_MS.items():
+        summary = _summarize([_import_seconds(module) for _ in range(runs)])
+        summary["budget_ms"] = budget
+        summary["within_budget"] = summary["p50_ms"] <= budget
+        results[f"startup.import.{module}"] = summary
+
+    # Whole CLI call as an agent makes it: interpreter start, imports, one cold search
+    command = [sys.executable, str(SCRIPTS_DIR / "search.py"), rng.choice(QUERY_MIX), "--no-daemon"]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    results["startup.cli.search"] = _summarize(timings)
+    return results
+
+
+def run(workloads=None, iterations=DEFAULT_ITERATIONS, scales=None, seed=SEED) -> dict:
+    """Run the selected workloads and return the JSON-serialisable report."""
+    workloads = workloads or WORKLOADS
+    scales = scales or DEFAULT_SCALES
+    rng = random.Random(seed)
+    results = {}
+    # Measure the scoring path itself; bench_search re-enables the result cache for its own workload
+    saved_cache_size, core.RESULT_CACHE_SIZE = core.RESULT_CACHE_SIZE, 0
+    if "search" in workloads:
+        results.update(bench_search(rng, iterations))
+    if "stack" in workloads:
+        results.update(bench_stack(rng, iterations))
+    if "fit" in workloads:
+        results.update(bench_fit(rng, iterations, scales))
+    if "score" in workloads:
+        results.update(bench_score(rng, iterations, scales))
+    if "design_system" in workloads:
+        results.update(bench_design_system(rng, iterations))
+    if "startup" in workloads:
+        results.update(bench_startup(rng, iterations))
+    core.RESULT_CACHE_SIZE = saved_cache_size
+    clear_cache()
+
+    from index_store import iter_data_files, load_index
+    precompiled = sum(1 for _, filepath, cols, weights in iter_data_files()
+                      if filepath.exists() and load_index(filepath, cols, field_weights=weights) is not None)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bm25_backend": core.BM25_BACKEND,
+            "precompiled_indexes": precompiled,
+            "iterations": iterations,
+            "scales": scales,
+            "seed": seed,
+        },
+        "results": dict(sorted(results.items())),
+    }
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Render p50/p95 changes of current vs baseline, one workload per line."""
+    lines = [f"{'workload':<32} {'p50 ms':>18} {'p95 ms':>18}"]
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            lines.append(f"{name:<32} {'(new)':>18}")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms"):
+            delta = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{now[key]:.3f} ({delta:+.0f}%)")
+        lines.append(f"{name:<32} {cells[0]:>18} {cells[1]:>18}")
+    return "\n".join(lines)
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max benchmarks")
+    parser.add_argument("--only", type=str, default=None, help=f"Comma-separated workloads ({', '.join(WORKLOADS)})")
+    parser.add_argument("--iterations", "-n", type=int, default=DEFAULT_ITERATIONS, help="Calls per warm workload")
+    parser.add_argument("--scales", type=str, default=None, help="Synthetic corpus scales (default: 1,10,100)")
+    parser.add_argument("--seed", type=int, default=SEED, help="Query mix seed")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Write the JSON report to this file")
+    parser.add_argument("--compare", "-c", type=str, default=None, help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    workloads = args.only.split(",") if args.only else None
+    unknown = set(workloads or []) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+    scales = [int(s) for s in args.scales.split(",")] if args.scales else None
+
+    report = run(workloads, args.iterations, scales, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(compare(json.load(f), report))
+    elif not args.output:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
@@ -4,15 +4,45 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
+import atexit
 import csv
+import io
+import os
 import re
+import sys
+from _thread import RLock  # threading itself is slow to import and only its lock is needed here
+from array import array
+from bisect import bisect_right
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from collections.abc import Sequence
+
+import profiling
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
+INDEX_CACHE_SIZE = 32  # Fitted indexes kept per process (10 domains + 13 stacks fit comfortably)
+
+# Scoring backend: "auto" (sparse when NumPy/SciPy import and the corpus is large), "python" or "sparse"
+BM25_BACKEND = os.environ.get("UIPRO_BM25_BACKEND", "auto")
+SPARSE_MIN_DOCS = 1000  # Below this the pure-Python postings walk beats matrix setup overhead
+
+# Search result LRU (0 disables it) and optional JSON file that keeps it across CLI invocations
+RESULT_CACHE_SIZE = int(os.environ.get("UIPRO_RESULT_CACHE_SIZE", "256"))
+RESULT_CACHE_FILE = os.environ.get("UIPRO_RESULT_CACHE")
+RESULT_CACHE_FORMAT = 2
+# Part of every result cache key: bump whenever a code change alters rankings (tokenizer, scoring, tie-breaks)
+SCORING_VERSION = 1
+
+# Worker count for parallel index builds and multi-domain fan-out (default: all cores)
+PARALLEL_WORKERS = int(os.environ.get("UIPRO_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# BM25F is opt-in per config: add "field_weights" mapping a search column to (weight, length
+# normalisation b), e.g. {"Style Category": (3.0, 0.5)}; unlisted columns get (1.0, DEFAULT_FIELD_B).
+# Without it (every shipped config) the columns are scored as one text. Check rankings before enabling.
+DEFAULT_FIELD_B = 0.75
 
 CSV_CONFIG = {
     "style": {
@@ -93,100 +123,878 @@ AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
 # ============ BM25 IMPLEMENTATION ============
+class Tokenizer:
+    """Precompiled tokenizer with an interned vocabulary (token -> integer id)"""
+
+    __slots__ = ("vocab", "terms")
+
+    _NON_WORD = re.compile(r'[^\w\s]')
+
+    def __init__(self):
+        self.vocab = {}   # token -> id
+        self.terms = []   # id -> token
+
+    def __len__(self):
+        return len(self.terms)
+
+    @classmethod
+    def tokenize(cls, text):
+        """Lowercase, split, remove punctuation, filter short words"""
+        return [w for w in cls._NON_WORD.sub(' ', str(text).lower()).split() if len(w) > 2]
+
+    def add(self, token):
+        """Intern token and return its id"""
+        term_id = self.vocab.get(token)
+        if term_id is None:
+            term_id = self.vocab[token] = len(self.terms)
+            self.terms.append(sys.intern(token))
+        return term_id
+
+    def encode(self, text, grow=False):
+        """Token ids of text in order; unknown tokens are interned when grow, otherwise dropped"""
+        if grow:
+            return [self.add(token) for token in self.tokenize(text)]
+        vocab = self.vocab
+        return [vocab[token] for token in self.tokenize(text) if token in vocab]
+
+    def copy(self):
+        clone = Tokenizer()
+        clone.vocab = dict(self.vocab)
+        clone.terms = list(self.terms)
+        return clone
+
+
+class PackedPostings(Sequence):
+    """Read-only term id -> (doc ids, tfs) postings in three flat arrays (CSR layout), e.g. memory-mapped"""
+
+    __slots__ = ("starts", "docs", "tfs")
+
+    def __init__(self, starts, docs, tfs):
+        self.starts = starts  # term id -> first position in docs/tfs; one extra entry marks the end
+        self.docs = docs
+        self.tfs = tfs
+
+    def __getitem__(self, term_id):
+        start, end = self.starts[term_id], self.starts[term_id + 1]
+        return self.docs[start:end], self.tfs[start:end]
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def get(self, term_id):
+        """(doc ids, tfs) of a term, or None when it has no postings"""
+        if term_id >= len(self) or self.starts[term_id] == self.starts[term_id + 1]:
+            return None
+        return self[term_id]
+
+    @classmethod
+    def pack(cls, postings, n_terms, term_order=None):
+        """Pack {term id: (doc ids, tfs)} postings; term_order lists old term ids in their new id order"""
+        starts, docs, tfs = array('I', [0]), array('I'), array('I')
+        for term_id in term_order if term_order is not None else range(n_terms):
+            entry = postings.get(term_id)
+            if entry is not None:
+                docs.extend(entry[0])
+                tfs.extend(entry[1])
+            starts.append(len(docs))
+        return cls(starts, docs, tfs)
+
+    def unpack(self):
+        """Growable {term id: (doc ids, tfs)} copy"""
+        return {term_id: (array('I', docs), array('I', tfs))
+                for term_id, (docs, tfs) in enumerate(self) if len(docs)}
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted-index backed); BM25F when fields are given"""
+
+    __slots__ = ("k1", "b", "keep_corpus", "tokenizer", "corpus", "doc_lengths", "avgdl",
+                 "idf", "doc_freqs", "postings", "N", "_doc_norms", "fields", "_field_postings", "_field_lengths")
 
-    def __init__(self, k1=1.5, b=0.75):
+    def __init__(self, k1=1.5, b=0.75, keep_corpus=True, fields=None):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.keep_corpus = keep_corpus  # False: drop per-document term id lists once postings exist
+        self.tokenizer = Tokenizer()
+        self.corpus = []                # per document: list of term ids
+        self.doc_lengths = array('I')
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.idf = array('d')           # term id -> IDF
+        self.doc_freqs = array('I')     # term id -> number of documents containing it
+        self.postings = []              # term id -> (doc ids, tfs) typed arrays, doc ids ascending
         self.N = 0
+        self._doc_norms = array('d')
+        # BM25F: (weight, b) per field. Documents are then sequences of field texts, and postings hold
+        # the weighted, per-field length normalised term frequency, so scoring is unchanged
+        self.fields = list(fields) if fields else None
+        self._field_postings = None     # per field: PackedPostings, or {term id: (doc ids, tfs)} while updating
+        self._field_lengths = None      # per field: doc id -> token count
 
-    def tokenize(self, text):
+    @staticmethod
+    def tokenize(text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return Tokenizer.tokenize(text)
+
+    def _encode(self, doc):
+        """Term ids of one document (growing the vocabulary): one list per field in BM25F mode"""
+        if self.fields:
+            return [self.tokenizer.encode(text, grow=True) for text in doc]
+        return self.tokenizer.encode(doc, grow=True)
 
+    @staticmethod
+    def _add_postings(postings, n_terms, doc_id, term_ids):
+        """Append one document's term frequencies to term id -> (doc ids, tfs) postings (list or sparse dict)"""
+        sparse = isinstance(postings, dict)
+        if not sparse:
+            while len(postings) < n_terms:
+                postings.append((array('I'), array('I')))
+        term_freqs = defaultdict(int)
+        for term_id in term_ids:
+            term_freqs[term_id] += 1
+        for term_id, tf in term_freqs.items():
+            entry = postings.get(term_id) if sparse else postings[term_id]
+            if entry is None:
+                entry = postings[term_id] = (array('I'), array('I'))
+            entry[0].append(doc_id)
+            entry[1].append(tf)
+
+    @profiling.timed("bm25.fit")
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        self.tokenizer = Tokenizer()
+        with profiling.stage("bm25.fit.tokenize"):
+            encoded = [self._encode(doc) for doc in documents]
+        corpus = [[term_id for field in doc for term_id in field] for doc in encoded] if self.fields else encoded
+        self.N = len(corpus)
+        self.corpus = corpus if self.keep_corpus else []
+        self.doc_freqs = array('I')
+        self.idf = array('d')
+        self.postings = []
+        self.doc_lengths = array('I', [len(doc) for doc in corpus])
+        if self.fields:
+            self._field_postings = [{} for _ in self.fields]
+            self._field_lengths = [array('I') for _ in self.fields]
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
+
+        # Inverted index over term ids (per field for BM25F; merged in _finalize)
+        with profiling.stage("bm25.fit.postings"):
+            n_terms = len(self.tokenizer)
+            if self.fields:
+                for doc_id, doc in enumerate(encoded):
+                    for field, term_ids in enumerate(doc):
+                        self._field_lengths[field].append(len(term_ids))
+                        self._add_postings(self._field_postings[field], n_terms, doc_id, term_ids)
+            else:
+                postings = []
+                for doc_id, doc in enumerate(corpus):
+                    self._add_postings(postings, n_terms, doc_id, doc)
+                self.postings = postings
+        with profiling.stage("bm25.fit.idf"):
+            self._finalize()
+
+    def _finalize(self, doc_freqs=None):
+        """Derive avgdl, document frequencies, IDF and length norms from doc_lengths and postings"""
+        if self._field_postings is not None:
+            self.postings = self._combine_fields()
+            # Only kept for add/remove_documents, so hold them packed (unpacked again by _mutable_postings)
+            n_terms = len(self.tokenizer)
+            self._field_postings = [postings if isinstance(postings, PackedPostings) else PackedPostings.pack(postings, n_terms)
+                                    for postings in self._field_postings]
         self.avgdl = sum(self.doc_lengths) / self.N
+        if doc_freqs is None:
+            doc_freqs = [len(docs) for docs, _ in self.postings]
+        self.doc_freqs = array('I', doc_freqs)
+
+        N = self.N
+        self.idf = array('d', [log((N - freq + 0.5) / (freq + 0.5) + 1) for freq in self.doc_freqs])
+
+        # Length normalisation only depends on the document, so compute it once
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+        if self.fields:
+            self._doc_norms = array('d', [k1]) * N  # BM25F: already applied per field in the postings
+        elif not avgdl:
+            self._doc_norms = array('d', [k1]) * N  # Every document is empty, so there are no postings to scale
+        else:
+            self._doc_norms = array('d', [k1 * (1 - b + b * doc_len / avgdl) for doc_len in self.doc_lengths])
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+    def _combine_fields(self):
+        """BM25F postings: per term and document, sum over fields of weight * tf / (1 - b + b * len / avg len)"""
+        scales = []
+        for (weight, b), lengths in zip(self.fields, self._field_lengths):
+            avg = sum(lengths) / self.N
+            scales.append([weight / (1 - b + b * length / avg) if length else 0.0 for length in lengths])
+
+        combined = []
+        for term_id in range(len(self.tokenizer)):
+            weights = {}
+            for postings, scale in zip(self._field_postings, scales):
+                entry = postings.get(term_id)
+                if entry is not None:
+                    for doc_id, tf in zip(*entry):
+                        weights[doc_id] = weights.get(doc_id, 0.0) + tf * scale[doc_id]
+            doc_ids = sorted(weights)
+            combined.append((array('I', doc_ids), array('d', [weights[doc_id] for doc_id in doc_ids])))
+        return combined
+
+    def copy(self):
+        """Independent copy (postings become plain arrays) that can be updated while this one is searched"""
+        clone = BM25.__new__(type(self))
+        for slot in BM25.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        clone.tokenizer = self.tokenizer.copy()
+        clone.corpus = list(self.corpus)
+        clone.doc_lengths = array('I', self.doc_lengths)
+        if self._field_postings is not None:
+            # Combined BM25F postings are rebuilt and packed field postings replaced, never mutated
+            clone._field_postings = [
+                postings if isinstance(postings, PackedPostings)
+                else {term_id: (array('I', docs), array('I', tfs)) for term_id, (docs, tfs) in postings.items()}
+                for postings in self._field_postings
+            ]
+            clone._field_lengths = [array('I', lengths) for lengths in self._field_lengths]
+        elif not self.fields:
+            clone.postings = [(array('I', docs), array('I', tfs)) for docs, tfs in self.postings]
+        return clone
+
+    def _mutable_postings(self):
+        """Postings and doc lengths as growable arrays (a memory-mapped index is copied once)"""
+        if not isinstance(self.doc_lengths, array):
+            self.doc_lengths = array('I', self.doc_lengths)
+        if self.fields:
+            if self._field_postings is None:
+                raise ValueError("BM25F index has no per-field postings; refit it to change documents")
+            self._field_postings = [postings.unpack() if isinstance(postings, PackedPostings) else postings
+                                    for postings in self._field_postings]
+            self._field_lengths = [lengths if isinstance(lengths, array) else array('I', lengths)
+                                   for lengths in self._field_lengths]
+            return None
+        if not isinstance(self.postings, list) or (self.postings and not isinstance(self.postings[0][0], array)):
+            self.postings = [(array('I', docs), array('I', tfs)) for docs, tfs in self.postings]
+        return self.postings
+
+    # add_documents/remove_documents update in place; copy() first if other threads may be searching
+    def add_documents(self, documents):
+        """Append documents (ids continue from N) and update DF, IDF and avgdl; equals a full refit"""
+        documents = list(documents)
+        if not documents:
+            return
+        postings = self._mutable_postings()
+        for doc_id, doc in enumerate(documents, self.N):
+            term_ids = self._encode(doc)
+            n_terms = len(self.tokenizer)
+            if self.fields:
+                for field, field_ids in enumerate(term_ids):
+                    self._field_lengths[field].append(len(field_ids))
+                    self._add_postings(self._field_postings[field], n_terms, doc_id, field_ids)
+                term_ids = [term_id for field_ids in term_ids for term_id in field_ids]
+            else:
+                self._add_postings(postings, n_terms, doc_id, term_ids)
+            if self.keep_corpus:
+                self.corpus.append(term_ids)
+            self.doc_lengths.append(len(term_ids))
+        self.N += len(documents)
+        self._finalize()
+
+    @staticmethod
+    def _remap_postings(postings, remap):
+        """Keep only documents in remap (old id -> new id) in term id -> (doc ids, tfs) postings (list or dict)"""
+        for term_id, (docs, tfs) in list(postings.items() if isinstance(postings, dict) else enumerate(postings)):
+            kept = [(remap[doc_id], tf) for doc_id, tf in zip(docs, tfs) if doc_id in remap]
+            postings[term_id] = (array('I', [d for d, _ in kept]), array('I', [tf for _, tf in kept]))
+
+    def remove_documents(self, doc_ids):
+        """Drop documents by id; later ids shift down so results match refitting without them"""
+        removed = set(doc_ids)
+        if not removed:
+            return
+        remap = {}
+        for old_id in range(self.N):
+            if old_id not in removed:
+                remap[old_id] = len(remap)
+
+        postings = self._mutable_postings()
+        if self.fields:
+            for field_postings in self._field_postings:
+                self._remap_postings(field_postings, remap)
+            self._field_lengths = [array('I', [length for doc_id, length in enumerate(lengths) if doc_id in remap])
+                                   for lengths in self._field_lengths]
+        else:
+            self._remap_postings(postings, remap)
+        self.doc_lengths = array('I', [length for doc_id, length in enumerate(self.doc_lengths) if doc_id in remap])
+        if self.keep_corpus:
+            self.corpus = [doc for doc_id, doc in enumerate(self.corpus) if doc_id in remap]
+        if not remap:
+            self.fit([])  # Same empty state (and vocabulary) as refitting on nothing
+            return
+        self.N = len(remap)
+        self._finalize()
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+    def _accumulate(self, query):
+        """Sum term contributions over the postings of query tokens only"""
+        scores = {}
+        numerator_k = self.k1 + 1
+        doc_norms = self._doc_norms
+        for term_id in self.tokenizer.encode(query):
+            idf = self.idf[term_id]
+            docs, tfs = self.postings[term_id]
+            for doc_id, tf in zip(docs, tfs):
+                score = idf * (tf * numerator_k) / (tf + doc_norms[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0) + score
+        profiling.count("bm25.docs_scored", len(scores))
+        return scores
 
+    @profiling.timed("bm25.score")
     def score(self, query):
         """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        scores = self._accumulate(query)
+        ranked = [(idx, scores.get(idx, 0)) for idx in range(self.N)]
+        return sorted(ranked, key=lambda x: x[1], reverse=True)
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+    @profiling.timed("bm25.top_k")
+    def top_k(self, query, k):
+        """Return the k best (doc_id, score) pairs with score > 0, ties broken by doc_id"""
+        import heapq  # Deferred: keeps CLI startup lean
+        scores = self._accumulate(query)
+        return heapq.nlargest(k, scores.items(), key=lambda x: (x[1], -x[0]))
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
 
-            scores.append((idx, score))
+_SPARSE_MODULES = None
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+def _load_sparse():
+    """Import NumPy and scipy.sparse on first use; return (numpy, scipy.sparse) or None"""
+    global _SPARSE_MODULES
+    if _SPARSE_MODULES is None:
+        try:
+            import numpy
+            import scipy.sparse
+            _SPARSE_MODULES = (numpy, scipy.sparse)
+        except ImportError:
+            _SPARSE_MODULES = False
+    return _SPARSE_MODULES or None
+
+
+class SparseBM25(BM25):
+    """BM25 scored by one sparse matrix-vector product over precomputed term weights (NumPy/SciPy)"""
+
+    __slots__ = ("_matrix",)
+
+    def __init__(self, k1=1.5, b=0.75, keep_corpus=True, fields=None):
+        super().__init__(k1, b, keep_corpus, fields)
+        self._matrix = None
+
+    def fit(self, documents):
+        self._matrix = None
+        super().fit(documents)
+
+    def copy(self):
+        clone = super().copy()
+        clone._matrix = self._matrix
+        return clone
+
+    def _finalize(self, doc_freqs=None):
+        super()._finalize(doc_freqs)
+        np, sparse = _load_sparse()
+
+        # CSC document x term-id matrix of full BM25 weights: column slicing per query term is cheap
+        numerator_k = self.k1 + 1
+        rows, cols, weights = [], [], []
+        for term_id, (docs, tfs) in enumerate(self.postings):
+            idf = self.idf[term_id]
+            for doc_id, tf in zip(docs, tfs):
+                rows.append(doc_id)
+                cols.append(term_id)
+                weights.append(idf * (tf * numerator_k) / (tf + self._doc_norms[doc_id]))
+        self._matrix = sparse.csc_matrix(
+            (np.array(weights, dtype=np.float64), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(self.N, len(self.postings))
+        )
+
+    def _query_matrix(self, queries):
+        """Term-count matrix (terms x queries); repeated query tokens count once per occurrence"""
+        np, sparse = _load_sparse()
+        rows, cols = [], []
+        for q_idx, query in enumerate(queries):
+            for term_id in self.tokenizer.encode(query):
+                rows.append(term_id)
+                cols.append(q_idx)
+        counts = np.ones(len(rows), dtype=np.float64)
+        return sparse.csc_matrix((counts, (rows, cols)), shape=(len(self.postings), len(queries)))
+
+    @profiling.timed("bm25.score_batch")
+    def score_batch(self, queries):
+        """Score every document against a batch of queries at once; returns an N x len(queries) array"""
+        np, _ = _load_sparse()
+        if self._matrix is None:
+            return np.zeros((self.N, len(queries)))
+        return (self._matrix @ self._query_matrix(queries)).toarray()
+
+    def _accumulate(self, query):
+        scores = self.score_batch([query])[:, 0]
+        return {int(idx): float(scores[idx]) for idx in scores.nonzero()[0]}
+
+    def _top_from_column(self, scores, k):
+        np, _ = _load_sparse()
+        if k <= 0:
+            return []
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            # Keep everything tied with the k-th best score so the doc_id tie-break matches BM25.top_k
+            threshold = np.partition(scores[candidates], -k)[-k]
+            candidates = candidates[scores[candidates] >= threshold]
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(int(candidates[i]), float(scores[candidates[i]])) for i in order]
+
+    @profiling.timed("bm25.top_k")
+    def top_k(self, query, k):
+        """Return the k best (doc_id, score) pairs with score > 0, ties broken by doc_id"""
+        return self._top_from_column(self.score_batch([query])[:, 0], k)
+
+    def top_k_batch(self, queries, k):
+        """top_k() for many queries with a single sparse matrix product"""
+        scores = self.score_batch(queries)
+        return [self._top_from_column(scores[:, q_idx], k) for q_idx in range(len(queries))]
+
+
+def _new_index(n_docs, keep_corpus=True, fields=None):
+    """Pick the scoring backend for a corpus of n_docs documents"""
+    if BM25_BACKEND == "sparse" or (BM25_BACKEND == "auto" and n_docs >= SPARSE_MIN_DOCS):
+        if _load_sparse() is not None:
+            return SparseBM25(keep_corpus=keep_corpus, fields=fields)
+    return BM25(keep_corpus=keep_corpus, fields=fields)
+
+
+def _merge_indexes(indexes):
+    """
+    One index over the documents of several, doc ids running through them in order.
+
+    Plain BM25 indexes merge into exactly the index of all their documents.
+    If any is BM25F, every member's length normalisation is folded into its
+    term frequencies (tf * k1 / norm scores identically), so each document
+    keeps the normalisation of its own index while IDF becomes global.
+    """
+    normalised = any(index.fields for index in indexes)
+    # A single unit field marks postings that already hold normalised term weights
+    merged = _new_index(sum(index.N for index in indexes), keep_corpus=False,
+                        fields=[(1.0, 0.0)] if normalised else None)
+    tokenizer, postings, doc_lengths = merged.tokenizer, merged.postings, merged.doc_lengths
+    offset = 0
+    for index in indexes:
+        term_ids = [tokenizer.add(term) for term in index.tokenizer.terms]
+        while len(postings) < len(tokenizer):
+            postings.append((array('I'), array('d' if normalised else 'I')))
+        k1, doc_norms = index.k1, index._doc_norms
+        for term_id, (docs, tfs) in zip(term_ids, index.postings):
+            merged_docs, merged_tfs = postings[term_id]
+            merged_docs.extend(doc_id + offset for doc_id in docs)
+            if normalised:
+                merged_tfs.extend(tf * k1 / doc_norms[doc_id] for doc_id, tf in zip(docs, tfs))
+            else:
+                merged_tfs.extend(tfs)
+        doc_lengths.extend(index.doc_lengths)
+        offset += index.N
+    merged.N = offset
+    if offset:
+        merged._finalize()
+    return merged
 
 
 # ============ SEARCH FUNCTIONS ============
+@profiling.timed("csv.load")
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
+def _csv_row_dict(fieldnames, record):
+    """Map a csv record onto fieldnames exactly like csv.DictReader (restkey/restval None)"""
+    row = dict(zip(fieldnames, record))
+    if len(record) > len(fieldnames):
+        row[None] = record[len(fieldnames):]
+    else:
+        for key in fieldnames[len(record):]:
+            row[key] = None
+    return row
+
+
+def _iter_csv_records(filepath, start=0):
+    """Yield (byte_offset, row_dict) for every data row, tracking where each record starts"""
+    with open(filepath, 'rb') as f:
+        yield from _iter_records(f, start)
+
+
+def _iter_records(f, start=0):
+    """_iter_csv_records over an open binary file; start skips to the record at that byte offset"""
+    position = 0
+
+    def lines():
+        nonlocal position
+        for raw in f:
+            position += len(raw)
+            yield raw.decode('utf-8').replace('\r\n', '\n')
+
+    reader = csv.reader(lines())
+    fieldnames = next(reader, None)
+    if fieldnames is None:
+        return
+    if start > position:
+        f.seek(start)
+        position = start
+    while True:
+        offset = position
+        record = next(reader, None)
+        if record is None:
+            return
+        if record:
+            yield offset, _csv_row_dict(fieldnames, record)
+
+
+def _read_csv_header(filepath):
+    """Return the column names of a CSV file"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return csv.DictReader(f).fieldnames
+
+
+def _read_csv_row(filepath, fieldnames, offset):
+    """Parse the single CSV record starting at byte offset"""
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        lines = (raw.decode('utf-8').replace('\r\n', '\n') for raw in f)
+        return _csv_row_dict(fieldnames, next(csv.reader(lines)))
+
+
+class LazyRows(Sequence):
+    """Row sequence that parses a CSV record (by byte offset) only when it is first accessed"""
+
+    def __init__(self, filepath, fieldnames, offsets):
+        self._filepath = filepath
+        self._fieldnames = fieldnames
+        self._offsets = offsets
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, idx):
+        row = self._rows.get(idx)
+        if row is None:
+            row = _read_csv_row(self._filepath, self._fieldnames, self._offsets[idx])
+            self._rows[idx] = row
+        return row
+
+    def with_appended(self, records):
+        """New LazyRows that also covers already parsed (byte_offset, row) records appended to the file"""
+        offsets = array('Q', self._offsets)
+        rows = dict(self._rows)
+        for offset, row in records:
+            rows[len(offsets)] = row
+            offsets.append(offset)
+        extended = LazyRows(self._filepath, self._fieldnames, offsets)
+        extended._rows = rows
+        return extended
+
+
+@profiling.timed("csv.scan")
+def _scan_csv(f, search_cols, fielded=False):
+    """Byte offsets and search documents of every record in a binary CSV file; rows are not kept"""
+    offsets = array('Q')
+    documents = []
+    for offset, row in _iter_records(f):
+        offsets.append(offset)
+        documents.append(_document(row, search_cols, fielded))
+    return offsets, documents
+
+
+# ============ INDEX CACHE ============
+# (filepath, search_cols, field_weights) -> (file version, parsed rows, fitted BM25, crc32 of the indexed bytes),
+# least recently used first
+_INDEX_CACHE = OrderedDict()
+_CACHE_LOCK = RLock()
+
+
+def _file_version(filepath):
+    """Cheap change detector for a data file: (mtime in ns, size in bytes)"""
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _field_spec(search_cols, field_weights):
+    """BM25F (weight, b) per search column, or None to score the columns as one text"""
+    if not field_weights:
+        return None
+    return [tuple(field_weights.get(col, (1.0, DEFAULT_FIELD_B))) for col in search_cols]
+
+
+def _document(row, search_cols, fielded=False):
+    """Build a document from search columns (one text per column for BM25F)"""
+    if fielded:
+        return [str(row.get(col, "")) for col in search_cols]
+    return " ".join(str(row.get(col, "")) for col in search_cols)
+
+
+def _documents(rows, search_cols, fielded=False):
+    return [_document(row, search_cols, fielded) for row in rows]
+
+
+def _fit_from_csv(filepath, search_cols, field_weights=None):
+    """
+    Scan a CSV and fit a fresh index over its search columns; returns (version, rows, bm25, crc).
+
+    Only byte offsets are kept per row: rows are parsed again from the file
+    when a search first returns them, so large unsearched cells never stay
+    in memory.
+    """
+    import zlib  # Deferred: only index builds and delta checks need it
+
+    version = _file_version(filepath)
+    raw = filepath.read_bytes()
+    crc = zlib.crc32(raw) if len(raw) == version[1] else None  # None: changed while reading, never patched
+
+    fields = _field_spec(search_cols, field_weights)
+    offsets, documents = _scan_csv(io.BytesIO(raw), search_cols, fielded=bool(fields))
+    bm25 = _new_index(len(documents), keep_corpus=False, fields=fields)
+    bm25.fit(documents)
+    data = LazyRows(filepath, _read_csv_header(filepath), offsets)
+    return version, data, bm25, crc
+
+
+@profiling.timed("index_cache.delta")
+def _apply_appended_rows(entry, filepath, search_cols, version):
+    """
+    Bring a cache entry up to date when rows were only appended to its file.
+
+    The bytes the entry was built from must be an unchanged prefix of the
+    current file ending in a newline; the new records are then indexed with
+    BM25.add_documents. Returns the new entry, or None if a refit is needed.
+    """
+    old_version, data, bm25, crc = entry
+    old_size = old_version[1]
+    if crc is None or version[1] <= old_size:
+        return None
+    import zlib
+    raw = filepath.read_bytes()
+    if (len(raw) != version[1] or raw[old_size - 1:old_size] != b"\n"
+            or zlib.crc32(raw[:old_size]) != crc):
+        return None
+
+    records = list(_iter_records(io.BytesIO(raw), start=old_size))
+    rows = [row for _, row in records]
+    # Searches already holding the old (rows, bm25) pair keep a consistent snapshot
+    bm25 = bm25.copy()
+    bm25.add_documents(_documents(rows, search_cols, fielded=bool(bm25.fields)))
+    data = data.with_appended(records)
+    profiling.count("index_cache.delta_rows", len(rows))
+    return version, data, bm25, zlib.crc32(raw)
+
+
+def _index_key(filepath, search_cols, field_weights=None):
+    return (str(filepath), tuple(search_cols), tuple(sorted((field_weights or {}).items())))
+
+
+def _store_index(key, entry):
+    """Insert a cache entry and evict the least recently used ones beyond INDEX_CACHE_SIZE"""
+    with _CACHE_LOCK:
+        _INDEX_CACHE[key] = entry
+        _INDEX_CACHE.move_to_end(key)
+        while len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+
+
+def _get_index(filepath, search_cols, field_weights=None):
+    """Return (rows, bm25) for a data file, re-reading and refitting only when the file changed"""
+    key = _index_key(filepath, search_cols, field_weights)
+    version = _file_version(filepath)
+
+    with _CACHE_LOCK:
+        entry = _INDEX_CACHE.get(key)
+        if entry is not None and entry[0] == version:
+            _INDEX_CACHE.move_to_end(key)
+            profiling.count("index_cache.hit")
+            return entry[1], entry[2]
+    profiling.count("index_cache.miss")
+
+    # Prefer the cached or precompiled index plus any appended rows; fall back to parsing and
+    # fitting the CSV. This happens outside the lock so different files can be loaded concurrently.
+    if entry is None:
+        from index_store import load_index_entry
+        entry = load_index_entry(filepath, search_cols, field_weights=field_weights)
+    if entry is not None and entry[0] != version:
+        entry = _apply_appended_rows(entry, filepath, search_cols, version)
+    if entry is None:
+        entry = _fit_from_csv(filepath, search_cols, field_weights)
+
+    _store_index(key, entry)
+    return entry[1], entry[2]
+
+
+def clear_cache():
+    """Drop every cached index and search result so the next search re-reads the CSV files"""
+    with _CACHE_LOCK:
+        _INDEX_CACHE.clear()
+        _RESULT_CACHE.clear()
+
+
+def make_executor(workers=None, kind="thread"):
+    """Create a pool for fan-out work: kind "thread" (shares the index cache) or "process" """
+    # Imported here: concurrent.futures (and multiprocessing) dominate core's import time otherwise
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    workers = workers or PARALLEL_WORKERS
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _index_jobs():
+    """(filepath, search_cols, field_weights) for every configured domain and stack file that exists"""
+    jobs = [(DATA_DIR / config["file"], config["search_cols"], config.get("field_weights"))
+            for config in CSV_CONFIG.values()]
+    jobs += [(DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS.get("field_weights"))
+             for config in STACK_CONFIG.values()]
+    return [job for job in jobs if job[0].exists()]
+
+
+def warm_cache(workers=None, kind="thread"):
+    """
+    Load or fit every domain and stack index concurrently into the process cache.
+
+    With kind="process" the CSVs are fitted in worker processes and the
+    fitted indexes shipped back; use it when fitting is CPU-bound (large
+    data files). Returns the number of indexes cached.
+    """
+    jobs = _index_jobs()
+    with make_executor(workers, kind) as pool:
+        if kind == "process":
+            for job, entry in zip(jobs, pool.map(_fit_from_csv, *zip(*jobs))):
+                _store_index(_index_key(*job), entry)
+        else:
+            list(pool.map(lambda job: _get_index(*job), jobs))
+    return len(jobs)
+
+
+@profiling.timed("search_csv")
+def _search_csv(filepath, search_cols, output_cols, query, max_results, field_weights=None):
+    """Core search function using BM25 (BM25F when field_weights are given)"""
     if not filepath.exists():
         return []
 
-    data = _load_csv(filepath)
-
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    data, bm25 = _get_index(filepath, search_cols, field_weights)
 
     # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+    ranked = bm25.top_k(query, max_results)
 
-    # Get top results with score > 0
+    # Get top results (top_k only yields documents with score > 0)
     results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    for idx, score in ranked:
+        row = data[idx]
+        results.append({col: row.get(col, "") for col in output_cols if col in row})
 
     return results
 
 
+# ============ RESULT CACHE ============
+# (data file, query tokens, max_results, file version, config id) -> result rows, least recently used first
+_RESULT_CACHE = OrderedDict()
+_RESULT_STATS = {"hits": 0, "misses": 0}
+_result_cache_state = {"loaded": False, "dirty": False}
+_CONFIG_IDS = {}
+
+
+def _config_id(*config):
+    """Stable fingerprint of search settings (columns, field weights) and SCORING_VERSION for result keys"""
+    text = repr((SCORING_VERSION,) + config)
+    config_id = _CONFIG_IDS.get(text)
+    if config_id is None:
+        import zlib
+        config_id = _CONFIG_IDS[text] = zlib.crc32(text.encode('utf-8'))
+    return config_id
+
+
+def _load_result_cache():
+    """Merge the persisted result cache (RESULT_CACHE_FILE) into memory once per process"""
+    if _result_cache_state["loaded"] or not RESULT_CACHE_FILE:
+        return
+    _result_cache_state["loaded"] = True
+    atexit.register(save_result_cache)
+    import json
+    try:
+        with open(RESULT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            persisted = json.load(f)
+        entries = persisted.get("entries", []) if persisted.get("version") == RESULT_CACHE_FORMAT else []
+    except (OSError, ValueError, AttributeError):
+        return  # Missing, corrupt or older cache file: start empty, it is rewritten at exit
+    with _CACHE_LOCK:
+        for file_label, tokens, max_results, version, config_id, results in entries:
+            _RESULT_CACHE.setdefault((file_label, tuple(tokens), max_results, tuple(version), config_id), results)
+
+
+def save_result_cache(path=None):
+    """Write the result cache to path (default RESULT_CACHE_FILE) if it changed; runs at exit"""
+    path = path or RESULT_CACHE_FILE
+    if not path or not _result_cache_state["dirty"]:
+        return
+    with _CACHE_LOCK:
+        entries = [[key[0], list(key[1]), key[2], list(key[3]), key[4], results] for key, results in _RESULT_CACHE.items()]
+        _result_cache_state["dirty"] = False
+    import json
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": RESULT_CACHE_FORMAT, "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Persistence is best effort; the in-memory cache stays valid
+
+
+def result_cache_info():
+    """Hit/miss counters and current size of the search result cache"""
+    with _CACHE_LOCK:
+        return dict(_RESULT_STATS, size=len(_RESULT_CACHE), maxsize=RESULT_CACHE_SIZE)
+
+
+def _cached_search_csv(file_label, filepath, search_cols, output_cols, query, max_results, field_weights=None):
+    """_search_csv behind an LRU keyed by normalised query tokens, the data file's version and the settings"""
+    if RESULT_CACHE_SIZE <= 0:
+        return _search_csv(filepath, search_cols, output_cols, query, max_results, field_weights)
+    return _cached_results(file_label, _file_version(filepath), _config_id(search_cols, field_weights, output_cols),
+                           query, max_results,
+                           lambda: _search_csv(filepath, search_cols, output_cols, query, max_results, field_weights))
+
+
+def _cached_results(file_label, version, config_id, query, max_results, compute):
+    """
+    Return compute()'s result rows through the result LRU.
+
+    version is a flat tuple of ints (data file versions); config_id is the
+    _config_id() of the settings that produced the results, so persisted
+    results are not served after a configuration or scoring change.
+    """
+    if RESULT_CACHE_SIZE <= 0:
+        return compute()
+
+    _load_result_cache()
+    key = (file_label, tuple(BM25.tokenize(query)), max_results, version, config_id)
+    with _CACHE_LOCK:
+        cached = _RESULT_CACHE.get(key)
+        if cached is not None:
+            _RESULT_CACHE.move_to_end(key)
+            _RESULT_STATS["hits"] += 1
+            return [dict(row) for row in cached]
+        _RESULT_STATS["misses"] += 1
+
+    results = compute()
+
+    with _CACHE_LOCK:
+        _RESULT_CACHE[key] = [dict(row) for row in results]
+        _RESULT_CACHE.move_to_end(key)
+        while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+        _result_cache_state["dirty"] = True
+    return results
+
+
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
     query_lower = query.lower()
@@ -210,7 +1018,9 @@ def detect_domain(query):
 
 
 def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+    """Main search function with auto-domain detection (domain "all" ranks every domain at once)"""
+    if domain == FEDERATED_DOMAIN:
+        return search_all(query, max_results)
     if domain is None:
         domain = detect_domain(query)
 
@@ -220,7 +1030,8 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _cached_search_csv(config["file"], filepath, config["search_cols"], config["output_cols"], query, max_results,
+                                 config.get("field_weights"))
 
     return {
         "domain": domain,
@@ -241,7 +1052,8 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _cached_search_csv(STACK_CONFIG[stack]["file"], filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results,
+                                 _STACK_COLS.get("field_weights"))
 
     return {
         "domain": "stack",
@@ -251,3 +1063,86 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+# ============ FEDERATED SEARCH ============
+FEDERATED_DOMAIN = "all"
+
+
+def _federated_members(include_stacks=False):
+    """(label, filepath, search_cols, output_cols, field_weights) for every domain (and stack) file that exists"""
+    members = [(domain, DATA_DIR / config["file"], config["search_cols"], config["output_cols"], config.get("field_weights"))
+               for domain, config in CSV_CONFIG.items()]
+    if include_stacks:
+        members += [(f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"],
+                     _STACK_COLS.get("field_weights"))
+                    for stack, config in STACK_CONFIG.items()]
+    return [member for member in members if member[1].exists()]
+
+
+def _get_federated_index(members, version):
+    """
+    Return (segments, starts, bm25) for one global index over all member files.
+
+    segments[i] is (label, rows, output_cols) of the member whose documents
+    start at global doc id starts[i]. The global index is merged from the
+    cached per-file indexes (no re-tokenizing) and rebuilt when any file changed.
+    """
+    key = ("<federated>", tuple(member[0] for member in members))
+    with _CACHE_LOCK:
+        entry = _INDEX_CACHE.get(key)
+        if entry is not None and entry[0] == version:
+            _INDEX_CACHE.move_to_end(key)
+            profiling.count("index_cache.hit")
+            return entry[1] + (entry[2],)
+    profiling.count("index_cache.miss")
+
+    segments, starts, indexes = [], [], []
+    start = 0
+    for label, filepath, search_cols, output_cols, field_weights in members:
+        rows, bm25 = _get_index(filepath, search_cols, field_weights)
+        segments.append((label, rows, output_cols))
+        starts.append(start)
+        indexes.append(bm25)
+        start += bm25.N
+    merged = _merge_indexes(indexes)
+
+    _store_index(key, (version, (segments, starts), merged, None))
+    return segments, starts, merged
+
+
+@profiling.timed("search_federated")
+def _search_federated(members, version, query, max_results):
+    segments, starts, bm25 = _get_federated_index(members, version)
+    results = []
+    for idx, score in bm25.top_k(query, max_results):
+        segment = bisect_right(starts, idx) - 1
+        label, rows, output_cols = segments[segment]
+        row = rows[idx - starts[segment]]
+        result = {"Domain": label}
+        result.update((col, row.get(col, "")) for col in output_cols if col in row)
+        results.append(result)
+    return results
+
+
+def search_all(query, max_results=MAX_RESULTS, include_stacks=False):
+    """
+    Federated search: one BM25 ranking (global IDF) over every domain, and
+    optionally every stack, in a single pass over shared postings.
+
+    Each result carries a "Domain" label ("stack:<name>" for stacks).
+    """
+    members = _federated_members(include_stacks)
+    version = tuple(n for member in members for n in _file_version(member[1]))
+    file_label = "<all+stacks>" if include_stacks else "<all>"
+    config_id = _config_id(*(member[:1] + member[2:] for member in members))
+    results = _cached_results(file_label, version, config_id, query, max_results,
+                              lambda: _search_federated(members, version, query, max_results))
+
+    return {
+        "domain": FEDERATED_DOMAIN,
+        "query": query,
+        "file": ", ".join(member[1].relative_to(DATA_DIR).as_posix() for member in members),
+        "count": len(results),
+        "results": results
+    }
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Daemon - Keeps UI/UX Pro Max indexes warm in one long-running process.
+
+Protocol: JSON lines over a Unix domain socket. Each request is one line
+    {"op": "search", "params": {"query": "...", "domain": "ux", "max_results": 3}}
+and is answered with one line
+    {"ok": true, "result": ...}   or   {"ok": false, "error": "..."}
+
+Ops: ping, search, search_all, search_stack, generate_design_system, shutdown
+
+Usage:
+    python search.py --serve                 # Start the daemon (foreground)
+    python search.py "<query>" ...           # Uses the daemon automatically when it is running
+"""
+
+import json
+import os
+from pathlib import Path
+
+from core import DATA_DIR, search, search_all, search_stack, warm_cache
+
+
+# ============ CONFIGURATION ============
+SOCKET_ENV = "UIPRO_SOCKET"
+DISABLE_ENV = "UIPRO_NO_DAEMON"
+CONNECT_TIMEOUT = 0.2  # Seconds; an absent daemon must not slow down the CLI
+REQUEST_TIMEOUT = 60.0
+
+
+class UnknownOpError(RuntimeError):
+    """The daemon does not know the requested op (e.g. an older daemon still running after an update)."""
+
+
+def default_socket_path() -> Path:
+    """Socket path from $UIPRO_SOCKET, else a temp dir path per user and data directory."""
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV])
+    import tempfile  # Only needed without $UIPRO_SOCKET; slow to import
+    import zlib
+
+    uid = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    # Each skill checkout gets its own daemon, so a CLI never gets answers from another dataset
+    data_id = zlib.crc32(str(DATA_DIR.resolve()).encode("utf-8"))
+    return Path(tempfile.gettempdir()) / f"ui-pro-max-{uid}-{data_id:08x}.sock"
+
+
+def is_supported() -> bool:
+    """Unix domain sockets are unavailable on some platforms (e.g. older Windows builds)."""
+    import socket
+
+    return hasattr(socket, "AF_UNIX")
+
+
+# ============ SERVER ============
+def _generate_design_system(**params):
+    from design_system import generate_design_system
+    return generate_design_system(**params)
+
+
+OPS = {
+    "ping": lambda: "pong",
+    "search": search,
+    "search_all": search_all,
+    "search_stack": search_stack,
+    "generate_design_system": _generate_design_system,
+}
+
+
+def _handle_lines(handler):
+    """Answer JSON-line requests until the client closes the connection (one thread per connection)."""
+    import threading
+
+    for line in handler.rfile:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            op = request.get("op")
+            if op == "shutdown":
+                response = {"ok": True, "result": "bye"}
+                # shutdown() waits for serve_forever() to return, so it cannot run on this thread
+                threading.Thread(target=handler.server.shutdown, daemon=True).start()
+            elif op in OPS:
+                response = {"ok": True, "result": OPS[op](**request.get("params", {}))}
+            else:
+                response = {"ok": False, "error": f"Unknown op: {op}"}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        handler.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+        handler.wfile.flush()
+
+
+def serve(socket_path=None):
+    """Warm all indexes and serve requests on a Unix socket until asked to shut down."""
+    if not is_supported():
+        raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+    socket_path = Path(socket_path) if socket_path else default_socket_path()
+    if socket_path.exists():
+        try:
+            request("ping", socket_path=socket_path)
+        except OSError:
+            socket_path.unlink()  # Stale socket left by a crashed daemon
+        else:
+            raise RuntimeError(f"A search daemon is already running on {socket_path}")
+
+    import socketserver  # Only the daemon itself needs it; every CLI call imports this module as a client
+
+    class _RequestHandler(socketserver.StreamRequestHandler):
+        handle = _handle_lines
+
+    warm_cache()
+    # A thread per connection, so an idle or slow client never blocks other CLI calls; the caches are lock-protected
+    with socketserver.ThreadingUnixStreamServer(str(socket_path), _RequestHandler) as server:
+        server.daemon_threads = True  # Open client connections must not keep the daemon alive after shutdown
+        os.chmod(socket_path, 0o600)
+        print(f"UI Pro Max search daemon listening on {socket_path}", flush=True)
+        try:
+            server.serve_forever(poll_interval=0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if socket_path.exists():
+                socket_path.unlink()
+
+
+# ============ CLIENT ============
+def request(op, socket_path=None, **params):
+    """
+    Send one request to the daemon and return its result.
+
+    Raises OSError when no daemon is reachable, ValueError when its reply is
+    malformed, UnknownOpError when it does not support op and RuntimeError
+    when it reports an error for the request.
+    """
+    socket_path = Path(socket_path) if socket_path else default_socket_path()
+    if not socket_path.exists():
+        # The usual case when no daemon runs: answer before importing socket, which is slow to import
+        raise FileNotFoundError(f"No search daemon socket at {socket_path}")
+    if not is_supported():
+        raise OSError("Unix domain sockets are not supported on this platform")
+
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(socket_path))
+        sock.settimeout(REQUEST_TIMEOUT)
+        payload = json.dumps({"op": op, "params": params}, ensure_ascii=False) + "\n"
+        sock.sendall(payload.encode("utf-8"))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+
+    if not line:
+        raise ConnectionError("Search daemon closed the connection without replying")
+    response = json.loads(line)  # A truncated reply raises json.JSONDecodeError, a ValueError
+    if not isinstance(response, dict) or (response.get("ok") and "result" not in response):
+        raise ValueError(f"Malformed reply from the search daemon: {line[:200]!r}")
+    if not response.get("ok"):
+        error = str(response.get("error", "Unknown daemon error"))
+        raise (UnknownOpError if error.startswith("Unknown op:") else RuntimeError)(error)
+    return response["result"]
+
+
+def try_request(op, socket_path=None, **params):
+    """
+    Like request(), but return None instead of raising when the daemon cannot answer.
+
+    That covers a missing or unreachable daemon, a malformed or truncated reply
+    and a daemon that does not know op, so callers fall back to in-process work.
+    Errors the daemon reports for a supported op are still raised.
+    """
+    if os.environ.get(DISABLE_ENV):
+        return None
+    try:
+        return request(op, socket_path=socket_path, **params)
+    except (OSError, ValueError, UnknownOpError):
+        return None
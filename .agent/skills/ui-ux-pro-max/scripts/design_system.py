@@ -16,9 +16,12 @@ Usage:
 import csv
 import json
 import os
+from _thread import allocate_lock
+from bisect import bisect_right
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+import profiling
+from core import search, make_executor, _file_version, DATA_DIR
 
 
 # ============ CONFIGURATION ============
@@ -37,9 +40,25 @@ SEARCH_CONFIG = {
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
-        self.reasoning_data = self._load_reasoning()
-
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self._reasoning_data = None  # ui-reasoning.csv is loaded on first rule lookup
+        self._reasoning_lock = allocate_lock()
+
+    @property
+    def reasoning_data(self) -> list:
+        """Reasoning rules, loaded (and indexed) on first access; safe to call from several threads."""
+        reasoning_data = self._reasoning_data
+        if reasoning_data is None:
+            with self._reasoning_lock:
+                reasoning_data = self._reasoning_data
+                if reasoning_data is None:  # Not loaded by a thread that held the lock first
+                    reasoning_data = self._load_reasoning()
+                    vars(self).update(self._build_rule_index(reasoning_data))
+                    self._reasoning_data = reasoning_data  # Published last: readers see a complete index
+        return reasoning_data
+
+    @profiling.timed("design_system.load_reasoning")
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
         filepath = DATA_DIR / REASONING_FILE
@@ -48,42 +67,95 @@ class DesignSystemGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+    @staticmethod
+    def _search_jobs(query: str, style_priority: list = None) -> dict:
+        """search() arguments per domain for the multi-domain step."""
+        jobs = {}
         for domain, config in SEARCH_CONFIG.items():
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                jobs[domain] = (combined_query, domain, config["max_results"])
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                jobs[domain] = (query, domain, config["max_results"])
+        return jobs
+
+    @profiling.timed("design_system.multi_domain_search")
+    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
+        """Execute searches across multiple domains (concurrently when workers > 1)."""
+        jobs = self._search_jobs(query, style_priority)
+        if self.workers > 1:
+            with make_executor(self.workers) as pool:
+                futures = {domain: pool.submit(search, *args) for domain, args in jobs.items()}
+                return {domain: future.result() for domain, future in futures.items()}
+        return {domain: search(*args) for domain, args in jobs.items()}
+
+    @staticmethod
+    def _build_rule_index(reasoning_data: list) -> dict:
+        """Precompute lookup tables that reproduce the exact/partial/keyword rule passes; returns {attribute: table}."""
+        by_category = {}   # lowercased UI_Category -> index of first rule with it
+        by_keyword = {}    # UI_Category keyword -> index of first rule containing it
+        offsets = []       # start of each rule's category inside _rule_haystack
+        categories = []
+        position = 0
+        for idx, rule in enumerate(reasoning_data):
+            ui_cat = rule.get("UI_Category", "").lower()
+            by_category.setdefault(ui_cat, idx)
+            for kw in ui_cat.replace("/", " ").replace("-", " ").split():
+                by_keyword.setdefault(kw, idx)
+            offsets.append(position)
+            categories.append(ui_cat)
+            position += len(ui_cat) + 1
+        return {
+            "_rule_by_category": by_category,
+            "_rule_by_keyword": by_keyword,
+            "_rule_offsets": offsets,
+            "_rule_memo": {},  # category -> resolved rule
+            # "category in ui_cat" becomes one C-level find over all categories; the first hit is the first rule
+            "_rule_haystack": "\0".join(categories),
+            "_max_category_len": max((len(c) for c in by_category), default=0),
+            "_max_keyword_len": max((len(k) for k in by_keyword), default=0),
+        }
+
+    @staticmethod
+    def _first_substring_match(text: str, table: dict, max_len: int, min_len: int = 0):
+        """Smallest rule index among table entries that occur as substrings of text."""
+        best = None
+        for length in range(min_len, min(len(text), max_len) + 1):
+            for start in range(len(text) - length + 1):
+                idx = table.get(text[start:start + length])
+                if idx is not None and (best is None or idx < best):
+                    best = idx
+        return best
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
+        reasoning_data = self.reasoning_data
+        rule = self._rule_memo.get(category)
+        if rule is not None:
+            return rule
+
         category_lower = category.lower()
 
         # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
+        idx = self._rule_by_category.get(category_lower)
 
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
+        # Try partial match: rule category inside the category, or the category inside a rule category
+        if idx is None:
+            idx = self._first_substring_match(category_lower, self._rule_by_category, self._max_category_len)
+            found = self._rule_haystack.find(category_lower) if reasoning_data else -1
+            if found != -1:
+                containing = bisect_right(self._rule_offsets, found) - 1
+                idx = containing if idx is None else min(idx, containing)
 
         # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+        if idx is None:
+            idx = self._first_substring_match(category_lower, self._rule_by_keyword, self._max_keyword_len, 1)
 
-        return {}
+        rule = reasoning_data[idx] if idx is not None else {}
+        self._rule_memo[category] = rule
+        return rule
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
@@ -160,14 +232,20 @@ class DesignSystemGenerator:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
+    @staticmethod
+    def _category(product_result: dict) -> str:
+        """Product category from the product search, or "General"."""
+        product_results = product_result.get("results", [])
+        if product_results:
+            return product_results[0].get("Product Type", "General")
+        return "General"
+
+    @profiling.timed("design_system.generate")
     def generate(self, query: str, project_name: str = None) -> dict:
         """Generate complete design system recommendation."""
         # Step 1: First search product to get category
         product_result = search(query, "product", 1)
-        product_results = product_result.get("results", [])
-        category = "General"
-        if product_results:
-            category = product_results[0].get("Product Type", "General")
+        category = self._category(product_result)
 
         # Step 2: Get reasoning rules for this category
         reasoning = self._apply_reasoning(category, {})
@@ -177,6 +255,11 @@ class DesignSystemGenerator:
         search_results = self._multi_domain_search(query, style_priority)
         search_results["product"] = product_result  # Reuse product search
 
+        return self._build_design_system(query, project_name, category, reasoning, search_results)
+
+    def _build_design_system(self, query: str, project_name: str, category: str,
+                             reasoning: dict, search_results: dict) -> dict:
+        """Steps 4-5 of generate(): pick the best match per domain and assemble the recommendation."""
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
         color_results = self._extract_results(search_results.get("color", {}))
@@ -239,6 +322,7 @@ class DesignSystemGenerator:
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
+@profiling.timed("format.ascii_box")
 def format_ascii_box(design_system: dict) -> str:
     """Format design system as ASCII box with emojis (MCP-style)."""
     project = design_system.get("project_name", "PROJECT")
@@ -364,6 +448,7 @@ def format_ascii_box(design_system: dict) -> str:
     return "\n".join(lines)
 
 
+@profiling.timed("format.markdown")
 def format_markdown(design_system: dict) -> str:
     """Format design system as markdown."""
     project = design_system.get("project_name", "PROJECT")
@@ -459,8 +544,23 @@ def format_markdown(design_system: dict) -> str:
 
 
 # ============ MAIN ENTRY POINT ============
+_GENERATORS = {}  # workers -> (reasoning file version, DesignSystemGenerator)
+
+
+def get_generator(workers: int = 1) -> DesignSystemGenerator:
+    """Return a process-wide generator, reloading it only when ui-reasoning.csv changes."""
+    filepath = DATA_DIR / REASONING_FILE
+    version = _file_version(filepath) if filepath.exists() else None
+    cached = _GENERATORS.get(workers)
+    if cached is None or cached[0] != version:
+        cached = (version, DesignSystemGenerator(workers))
+        _GENERATORS[workers] = cached
+    return cached[1]
+
+
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           workers: int = 1) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,11 +571,12 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        workers: Run the multi-domain searches on this many threads (1 = sequential)
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
+    generator = get_generator(workers)
     design_system = generator.generate(query, project_name)
     
     # Persist to files if requested
@@ -487,8 +588,81 @@ def generate_design_system(query: str, project_name: str = None, output_format:
     return format_ascii_box(design_system)
 
 
+# ============ BULK GENERATION ============
+def load_manifest(path: str) -> list:
+    """
+    Load a bulk-generation manifest: a JSON array or JSON Lines of
+    {"query": ..., "project_name": ..., "pages": [...]} entries.
+
+    Raises ValueError for invalid JSON or a top level that is not a list of
+    entries; the entries themselves are checked when they are generated.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not isinstance(entries, list):
+        raise ValueError(f"Manifest must be a JSON array or JSON Lines of entries: {path}")
+    return entries
+
+
+def _generate_manifest_entry(generator: DesignSystemGenerator, entry: dict, output_format: str,
+                             persist: bool, output_dir: str) -> dict:
+    """Generate (and optionally persist) one manifest entry; errors are reported, not raised."""
+    if not isinstance(entry, dict):
+        return {"project_name": None, "error": f"Manifest entry is not an object: {entry!r:.80}"}
+    query = entry.get("query")
+    if not query:
+        return {"project_name": entry.get("project_name"), "error": "Manifest entry has no query"}
+    try:
+        design_system = generator.generate(query, entry.get("project_name"))
+        files = []
+        if persist:
+            pages = entry.get("pages") or []
+            if isinstance(pages, str):
+                pages = [pages]
+            for page in pages or [None]:
+                created = persist_design_system(design_system, page, output_dir, query)
+                files.extend(f for f in created["created_files"] if f not in files)
+        output = format_markdown(design_system) if output_format == "markdown" else format_ascii_box(design_system)
+        return {"project_name": design_system["project_name"], "query": query, "output": output, "files": files}
+    except Exception as e:
+        return {"project_name": entry.get("project_name"), "query": query, "error": f"{type(e).__name__}: {e}"}
+
+
+def generate_design_systems(manifest: list, output_format: str = "ascii", persist: bool = True,
+                            output_dir: str = None, workers: int = 1) -> list:
+    """
+    Bulk entry point: generate design systems for many projects in one run.
+
+    All entries share one generator and the process-wide index cache, so
+    ui-reasoning.csv and every data file are loaded once per run.
+
+    Args:
+        manifest: List of {"query", "project_name", "pages"} dicts (see load_manifest)
+        output_format: "ascii" (default) or "markdown"
+        persist: If True (default), write MASTER.md and page overrides per project
+        output_dir: Optional output directory (defaults to current working directory)
+        workers: Generate this many projects concurrently (1 = sequential)
+
+    Returns:
+        One result dict per manifest entry, in manifest order, with "output" and
+        "files" on success or "error" on failure
+    """
+    generator = get_generator()
+    if workers > 1:
+        with make_executor(workers) as pool:
+            futures = [pool.submit(_generate_manifest_entry, generator, entry, output_format, persist, output_dir)
+                       for entry in manifest]
+            return [future.result() for future in futures]
+    return [_generate_manifest_entry(generator, entry, output_format, persist, output_dir) for entry in manifest]
+
+
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None,
+                          page_searches: dict = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
     
@@ -497,6 +671,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        page_searches: Optional precomputed override searches (see OVERRIDE_SEARCHES)
     
     Returns:
         dict with created file paths and status
@@ -527,7 +702,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     # If page is specified, create page override file with intelligent content
     if page:
         page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
+        page_content = format_page_override_md(design_system, page, page_query, page_searches)
         with open(page_file, 'w', encoding='utf-8') as f:
             f.write(page_content)
         created_files.append(str(page_file))
@@ -539,6 +714,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     }
 
 
+@profiling.timed("format.master_md")
 def format_master_md(design_system: dict) -> str:
     """Format design system as MASTER.md with hierarchical override logic."""
     project = design_system.get("project_name", "PROJECT")
@@ -802,14 +978,16 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+@profiling.timed("format.page_override_md")
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            searches: dict = None) -> str:
     """Format a page-specific override file with intelligent AI-generated content."""
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, searches)
     
     lines = []
     
@@ -911,23 +1089,34 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+OVERRIDE_SEARCHES = {"style": 1, "ux": 3, "landing": 1}  # domain -> max_results for page overrides
+
+
+def _override_context(page_name: str, page_query: str) -> str:
+    """Search context for a page's overrides."""
+    return f"{page_name.lower()} {(page_query or '').lower()}"
+
+
+@profiling.timed("design_system.intelligent_overrides")
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict,
+                                    searches: dict = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
-    data instead of hardcoded page types.
+    data instead of hardcoded page types. searches, if given, holds the
+    OVERRIDE_SEARCHES results already run for _override_context().
     """
     from core import search
     
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
+    combined_context = _override_context(page_name, page_query)
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    if searches is None:
+        searches = {domain: search(combined_context, domain, max_results=n) for domain, n in OVERRIDE_SEARCHES.items()}
+    style_search = searches["style"]
+    ux_search = searches["ux"]
+    landing_search = searches["landing"]
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -1057,11 +1246,24 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Generate Design System")
-    parser.add_argument("query", help="Search query (e.g., 'SaaS dashboard')")
+    parser.add_argument("query", nargs="?", help="Search query (e.g., 'SaaS dashboard')")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name")
     parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format")
+    parser.add_argument("--manifest", "-m", type=str, default=None, help="Bulk mode: JSON/JSONL manifest of projects to generate and persist")
+    parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Projects generated concurrently in bulk mode (default: 1)")
 
     args = parser.parse_args()
 
-    result = generate_design_system(args.query, args.project_name, args.format)
-    print(result)
+    if args.manifest:
+        for result in generate_design_systems(load_manifest(args.manifest), args.format,
+                                              output_dir=args.output_dir, workers=args.workers):
+            if "error" in result:
+                print(f"❌ {result.get('project_name') or result.get('query')}: {result['error']}")
+            else:
+                print(f"✅ {result['project_name']}: {len(result['files'])} files")
+    elif args.query:
+        result = generate_design_system(args.query, args.project_name, args.format)
+        print(result)
+    else:
+        parser.error("a query or --manifest is required")
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index Store - Precompiled on-disk BM25 indexes for the UI/UX Pro Max data files.
+
+Every CSV in CSV_CONFIG / STACK_CONFIG can be compiled into a compact binary
+index (vocabulary, postings, document lengths, row byte offsets) under
+INDEX_DIR. At search time the index is memory-mapped instead of parsing and
+tokenizing the CSV; when rows were only appended to the source file since the
+build, the cache layer indexes just the new rows, otherwise a stale index is
+ignored and the caller falls back to fitting from CSV.
+
+Usage:
+    python index_store.py              # Build indexes for all domains and stacks
+    python index_store.py -w 4         # ... using 4 worker processes
+    python index_store.py --check      # Report which indexes are missing or stale
+"""
+
+import io
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+
+import profiling
+from core import (
+    BM25, CSV_CONFIG, STACK_CONFIG, _STACK_COLS, DATA_DIR,
+    LazyRows, PackedPostings, _field_spec, _file_version, _new_index, _read_csv_header, _scan_csv, make_executor
+)
+
+
+# ============ CONFIGURATION ============
+INDEX_DIR = DATA_DIR.parent / "index"
+INDEX_SUFFIX = ".idx"
+
+MAGIC = b"UIPX"
+FORMAT_VERSION = 4
+BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+# BM25F: term frequencies are float64 field-weighted, normalised weights, and the per-field postings
+# and lengths follow the vocabulary so appended rows can be indexed as a delta
+FLAG_FIELDED = 1
+
+# magic, version, byte order, flags, source mtime_ns, source size, source crc, search_cols crc,
+# N, term count, postings count, vocabulary blob size
+HEADER = struct.Struct("<4sHHHqQIIIIII")
+ALIGN = 8
+
+
+# ============ PATHS ============
+def index_path_for(filepath):
+    """Map a data file (e.g. data/stacks/react.csv) to its index (index/stacks/react.idx)"""
+    relative = Path(filepath).resolve().relative_to(DATA_DIR.resolve())
+    return INDEX_DIR / relative.with_suffix(INDEX_SUFFIX)
+
+
+def _cols_crc(search_cols, field_weights=None):
+    fields = _field_spec(search_cols, field_weights) or []
+    return zlib.crc32("\x1f".join(list(search_cols) + [repr(field) for field in fields]).encode("utf-8"))
+
+
+def _pad(size):
+    return (-size) % ALIGN
+
+
+# ============ BUILD ============
+def build_index(filepath, search_cols, index_path=None, field_weights=None):
+    """Compile one CSV into a binary index file and return its path"""
+    filepath = Path(filepath)
+    index_path = Path(index_path) if index_path else index_path_for(filepath)
+    mtime_ns = _file_version(filepath)[0]
+    raw = filepath.read_bytes()  # Offsets, documents and crc all describe exactly these bytes
+
+    fields = _field_spec(search_cols, field_weights)
+    offsets, documents = _scan_csv(io.BytesIO(raw), search_cols, fielded=bool(fields))
+
+    bm25 = BM25(keep_corpus=False, fields=fields)
+    bm25.fit(documents)
+
+    # Vocabulary is stored sorted; term ids in the file are positions in that order
+    tokenizer = bm25.tokenizer
+    order = sorted(range(len(tokenizer)), key=tokenizer.terms.__getitem__)
+    vocab = bytearray()
+    term_offsets = array("I", [0])
+    starts = array("I", [0])
+    post_docs = array("I")
+    post_tfs = array("d" if fields else "I")
+    for term_id in order:
+        vocab += tokenizer.terms[term_id].encode("utf-8")
+        term_offsets.append(len(vocab))
+        docs, tfs = bm25.postings[term_id]
+        post_docs.extend(docs)
+        post_tfs.extend(tfs)
+        starts.append(len(post_docs))
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, BYTE_ORDER, FLAG_FIELDED if fields else 0,
+        mtime_ns, len(raw), zlib.crc32(raw), _cols_crc(search_cols, field_weights),
+        len(documents), len(order), len(post_docs), len(vocab)
+    )
+    sections = [
+        bm25.doc_lengths.tobytes(),
+        offsets.tobytes(),
+        term_offsets.tobytes(),
+        starts.tobytes(),
+        post_docs.tobytes(),
+        post_tfs.tobytes(),
+        bytes(vocab),
+    ]
+    if fields:
+        # Per field, renumbered to the sorted vocabulary: postings count, then lengths and CSR postings
+        packed = [PackedPostings.pack(postings, len(order), term_order=order) for postings in bm25._field_postings]
+        sections.append(array("I", [len(field.docs) for field in packed]).tobytes())
+        for lengths, field in zip(bm25._field_lengths, packed):
+            sections += [lengths.tobytes(), field.starts.tobytes(), field.docs.tobytes(), field.tfs.tobytes()]
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix(INDEX_SUFFIX + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header + b"\0" * _pad(len(header)))
+        for section in sections:
+            f.write(section + b"\0" * _pad(len(section)))
+    tmp_path.replace(index_path)
+    return index_path
+
+
+def iter_data_files():
+    """Yield (label, filepath, search_cols, field_weights) for every configured domain and stack"""
+    for domain, config in CSV_CONFIG.items():
+        yield domain, DATA_DIR / config["file"], config["search_cols"], config.get("field_weights")
+    for stack, config in STACK_CONFIG.items():
+        yield f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS.get("field_weights")
+
+
+def build_all(workers=1):
+    """Build indexes for every configured data file (in worker processes when workers > 1)"""
+    jobs = [job for job in iter_data_files() if job[1].exists()]
+    if workers > 1:
+        with make_executor(workers, "process") as pool:
+            paths = pool.map(build_index, [job[1] for job in jobs], [job[2] for job in jobs],
+                             [None] * len(jobs), [job[3] for job in jobs])
+            return {job[0]: path for job, path in zip(jobs, paths)}
+    return {label: build_index(filepath, cols, field_weights=weights) for label, filepath, cols, weights in jobs}
+
+
+# ============ LOAD ============
+def load_index(filepath, search_cols, index_path=None, field_weights=None):
+    """
+    Memory-map a precompiled index for a data file.
+
+    Returns (rows, bm25) where rows are read lazily by byte offset, or None
+    when the index is missing, malformed or stale for the current CSV.
+    """
+    entry = load_index_entry(filepath, search_cols, index_path, field_weights)
+    if entry is None or entry[0] != _file_version(Path(filepath)):
+        return None
+    return entry[1], entry[2]
+
+
+@profiling.timed("index_store.load")
+def load_index_entry(filepath, search_cols, index_path=None, field_weights=None):
+    """
+    Memory-map a precompiled index as an index cache entry (version, rows, bm25, source crc).
+
+    version is the source file's (mtime_ns, size) when the index was built,
+    which may be older than the file; the cache layer then applies appended
+    rows or refits. Postings (and a BM25F index's per-field postings) stay
+    memory-mapped until rows are appended. Returns None when the index is
+    missing or malformed.
+    """
+    filepath = Path(filepath)
+    try:
+        index_path = Path(index_path) if index_path else index_path_for(filepath)
+    except ValueError:
+        return None
+    if not index_path.exists():
+        return None
+
+    with open(index_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+    if len(mm) < HEADER.size:
+        return None
+
+    (magic, fmt_version, byte_order, flags, mtime_ns, size, source_crc, cols_crc,
+     n_docs, n_terms, n_postings, vocab_size) = HEADER.unpack_from(mm, 0)
+    fields = _field_spec(search_cols, field_weights)
+    if (magic != MAGIC or fmt_version != FORMAT_VERSION or byte_order != BYTE_ORDER
+            or bool(flags & FLAG_FIELDED) != bool(fields) or cols_crc != _cols_crc(search_cols, field_weights)):
+        return None
+
+    view = memoryview(mm)
+    pos = HEADER.size + _pad(HEADER.size)
+
+    def take(count, fmt, itemsize):
+        nonlocal pos
+        nbytes = count * itemsize
+        section = view[pos:pos + nbytes]
+        pos += nbytes + _pad(nbytes)
+        return section.cast(fmt) if fmt else section
+
+    try:
+        doc_lengths = take(n_docs, "I", 4)
+        offsets = take(n_docs, "Q", 8)
+        term_offsets = take(n_terms + 1, "I", 4)
+        starts = take(n_terms + 1, "I", 4)
+        post_docs = take(n_postings, "I", 4)
+        post_tfs = take(n_postings, "d", 8) if fields else take(n_postings, "I", 4)
+        vocab = bytes(take(vocab_size, None, 1))
+        field_postings, field_lengths = [], []
+        if fields:
+            for count in take(len(fields), "I", 4).tolist():
+                field_lengths.append(take(n_docs, "I", 4))
+                field_postings.append(PackedPostings(take(n_terms + 1, "I", 4), take(count, "I", 4), take(count, "I", 4)))
+    except TypeError:
+        return None  # Truncated file: a section length is not a whole number of items
+    if len(vocab) != vocab_size or pos > len(mm):
+        return None  # Truncated file: every section is written padded, so the file ends at pos
+
+    bm25 = _new_index(n_docs, keep_corpus=False, fields=fields)
+    bm25.N = n_docs
+    for i in range(n_terms):
+        bm25.tokenizer.add(vocab[term_offsets[i]:term_offsets[i + 1]].decode("utf-8"))
+    if n_docs:
+        bm25.doc_lengths = doc_lengths
+        bm25.postings = PackedPostings(starts, post_docs, post_tfs)
+        bm25._finalize([starts[i + 1] - starts[i] for i in range(n_terms)])
+    if fields:
+        # Attached after _finalize: the combined postings are already in the file
+        bm25._field_postings = field_postings
+        bm25._field_lengths = field_lengths
+
+    rows = LazyRows(filepath, _read_csv_header(filepath), offsets)
+    return (mtime_ns, size), rows, bm25, source_crc
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build precompiled search indexes")
+    parser.add_argument("--check", action="store_true", help="Only report missing or stale indexes")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Build indexes in this many processes (default: 1)")
+    args = parser.parse_args()
+
+    if args.check:
+        for label, filepath, search_cols, field_weights in iter_data_files():
+            status = "ok" if load_index(filepath, search_cols, field_weights=field_weights) is not None else "stale/missing"
+            print(f"{label:<24} {status}")
+    else:
+        for label, index_path in build_all(args.workers).items():
+            print(f"{label:<24} -> {index_path}")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profiling - Opt-in per-stage timings and counters for the search hot paths.
+
+Enable with UIPRO_PROFILE=1, `search.py --profile`, or profiling.enable().
+While disabled, an instrumented call costs one flag check.
+
+Usage:
+    import profiling
+    profiling.enable()
+    profiling.add_hook(lambda stage, seconds: print(stage, seconds))
+    ...  # search(), generate_design_system(), ...
+    print(profiling.format_report())
+"""
+
+import functools
+import os
+from _thread import allocate_lock  # Same lock as threading.Lock(), without importing threading at startup
+from time import perf_counter
+
+
+# ============ STATE ============
+ENABLED = bool(os.environ.get("UIPRO_PROFILE"))
+
+_stages = {}     # stage -> [calls, total seconds, max seconds]
+_counters = {}   # counter -> value
+_hooks = []      # callables(stage, seconds) invoked after every timed stage
+_lock = allocate_lock()
+
+
+def enable():
+    """Start recording timings and counters."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Stop recording; already collected data is kept until reset()."""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Forget all recorded timings and counters."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def add_hook(hook):
+    """Call hook(stage, seconds) after every timed stage while profiling is enabled."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+# ============ RECORDING ============
+def record(stage: str, seconds: float):
+    """Add one timed call of stage."""
+    with _lock:
+        entry = _stages.get(stage)
+        if entry is None:
+            _stages[stage] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+    for hook in _hooks:
+        hook(stage, seconds)
+
+
+def count(counter: str, amount: int = 1):
+    """Increment a counter (no-op while disabled)."""
+    if ENABLED:
+        with _lock:
+            _counters[counter] = _counters.get(counter, 0) + amount
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    """contextlib.nullcontext() without importing contextlib at startup."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """Context manager timing a block as stage `name` (a shared no-op while disabled)."""
+    return _Stage(name) if ENABLED else _NULL_STAGE
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as stage `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ============ REPORTING ============
+def report() -> dict:
+    """Structured snapshot: {"stages": {stage: timings}, "counters": {counter: value}}."""
+    with _lock:
+        stages = {
+            name: {
+                "calls": calls,
+                "total_ms": round(total * 1000, 4),
+                "mean_ms": round(total / calls * 1000, 4),
+                "max_ms": round(longest * 1000, 4),
+            }
+            for name, (calls, total, longest) in sorted(_stages.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"stages": stages, "counters": counters}
+
+
+def format_report() -> str:
+    """Human-readable table of report(), slowest stages first."""
+    data = report()
+    lines = ["## Profile", f"{'stage':<36} {'calls':>7} {'total ms':>11} {'mean ms':>10} {'max ms':>10}"]
+    for name, s in sorted(data["stages"].items(), key=lambda item: item[1]["total_ms"], reverse=True):
+        lines.append(f"{name:<36} {s['calls']:>7} {s['total_ms']:>11.3f} {s['mean_ms']:>10.3f} {s['max_ms']:>10.3f}")
+    if data["counters"]:
+        lines.append("")
+        for name, value in data["counters"].items():
+            lines.append(f"{name:<36} {value:>7}")
+    return "\n".join(lines)
@@ -3,20 +3,33 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --domain all [--with-stacks]   (one ranking across every domain)
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --serve   (warm daemon; later calls use it automatically)
+       python search.py --manifest projects.json [-o out/] [-w 4]   (bulk design systems, persisted)
+       python search.py --batch queries.txt [--domain <domain>] [--stack <stack>]   (JSONL out, "-" = stdin)
 
-Domains: style, prompt, color, chart, landing, product, ux, typography
+Domains: style, prompt, color, chart, landing, product, ux, typography, all
 Stacks: html-tailwind, react, nextjs
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+
+Precompiled indexes (optional, faster cold start):
+  python index_store.py   Compile every data CSV into index/*.idx (stale indexes fall back to CSV)
 """
 
 import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import atexit
+import json
+import os
+import sys
+import profiling
+from core import CSV_CONFIG, AVAILABLE_STACKS, FEDERATED_DOMAIN, MAX_RESULTS, search, search_all, search_stack
+from daemon import serve, try_request
+# design_system is imported only by the paths that generate design systems (faster plain searches)
 
 
 def format_output(result):
@@ -45,10 +58,63 @@ def format_output(result):
     return "\n".join(output)
 
 
+def _batch_spec_error(spec):
+    """Why a batch line's JSON spec is unusable, or None."""
+    if not isinstance(spec, dict):
+        return "expected a JSON object"
+    if not isinstance(spec.get("query"), str) or not spec["query"].strip():
+        return "missing query" if not spec.get("query") else "query must be a string"
+    n = spec.get("max_results")
+    if n is not None and (not isinstance(n, int) or isinstance(n, bool) or n < 1):
+        return "max_results must be a positive integer"
+    for key in ("domain", "stack"):
+        if spec.get(key) is not None and not isinstance(spec[key], str):
+            return f"{key} must be a string"
+    return None
+
+
+def iter_batch(lines, domain=None, stack=None, max_results=MAX_RESULTS):
+    """
+    Yield one search()/search_stack() result per non-blank input line, in input order.
+
+    A line is either a plain query or a JSON object with "query" and optional
+    "domain", "stack" and "max_results" overriding the batch-wide defaults.
+    A line that cannot be searched yields {"error": ...} and the batch goes on.
+    """
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"error": f"Line {line_no}: invalid JSON ({e})"}
+                continue
+        else:
+            spec = {"query": line}
+
+        error = _batch_spec_error(spec)
+        if error:
+            yield {"error": f"Line {line_no}: {error}"}
+            continue
+        query = spec["query"]
+        n = spec.get("max_results") or max_results
+        line_stack = spec.get("stack", stack)
+        try:
+            if line_stack:
+                yield search_stack(query, line_stack, n)
+            else:
+                yield search(query, spec.get("domain", domain), n)
+        except Exception as e:
+            yield {"error": f"Line {line_no}: {type(e).__name__}: {e}"}
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()) + [FEDERATED_DOMAIN], help="Search domain ('all' merges every domain into one ranking)")
+    parser.add_argument("--with-stacks", action="store_true", help="With --domain all, also rank stack guidelines")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
@@ -60,18 +126,80 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Threads for design system searches / bulk projects (default: 1, sequential)")
+    parser.add_argument("--manifest", "-m", type=str, default=None, help="Bulk mode: JSON/JSONL list of {query, project_name, pages}; generates and persists each")
+    # Daemon (keeps indexes warm between invocations)
+    parser.add_argument("--serve", action="store_true", help="Run the search daemon; later invocations use it automatically")
+    parser.add_argument("--socket", type=str, default=None, help="Daemon socket path (default: $UIPRO_SOCKET or a per-user temp path)")
+    parser.add_argument("--no-daemon", action="store_true", help="Always search in-process, even if a daemon is running")
+    parser.add_argument("--profile", action="store_true", help="Print per-stage timings to stderr (runs in-process; also UIPRO_PROFILE=1)")
+    # Batch mode
+    parser.add_argument("--batch", "-b", type=str, default=None, help="File of queries (one per line or JSONL, '-' for stdin); prints JSONL results")
 
     args = parser.parse_args()
 
+    if args.profile or profiling.ENABLED:
+        # Timings are only recorded in this process, so bypass the daemon
+        profiling.enable()
+        args.no_daemon = True
+        if args.json:
+            atexit.register(lambda: print(json.dumps(profiling.report(), indent=2), file=sys.stderr))
+        else:
+            atexit.register(lambda: print("\n" + profiling.format_report(), file=sys.stderr))
+
+    if args.serve:
+        serve(args.socket)
+        sys.exit(0)
+    if args.manifest:
+        from design_system import generate_design_systems, load_manifest
+        try:
+            manifest = load_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read manifest: {e}")
+        results = generate_design_systems(manifest, args.format,
+                                          output_dir=args.output_dir, workers=args.workers)
+        if args.json:
+            print(json.dumps(results, indent=2, ensure_ascii=False))
+        else:
+            for number, result in enumerate(results, 1):
+                if "error" in result:
+                    print(f"❌ {result.get('project_name') or result.get('query') or f'Entry {number}'}: {result['error']}")
+                else:
+                    print(f"✅ {result['project_name']}: {len(result['files'])} files")
+                    for path in result["files"]:
+                        print(f"   📄 {path}")
+        sys.exit(1 if any("error" in result for result in results) else 0)
+    if args.batch:
+        source = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+        with source:
+            for result in iter_batch(source, args.domain, args.stack, args.max_results):
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+        sys.exit(0)
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
+    def run(op, local, **params):
+        """Answer through the daemon when one is running, otherwise in-process."""
+        if not args.no_daemon:
+            result = try_request(op, socket_path=args.socket, **params)
+            if result is not None:
+                return result
+        return local(**params)
+
     # Design system takes priority
     if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
+        from design_system import generate_design_system
+        result = run(
+            "generate_design_system",
+            generate_design_system,
+            query=args.query,
+            project_name=args.project_name,
+            output_format=args.format,
             persist=args.persist,
             page=args.page,
-            output_dir=args.output_dir
+            # The daemon has its own working directory, so always send an absolute path
+            output_dir=os.path.abspath(args.output_dir) if args.output_dir else os.getcwd(),
+            workers=args.workers
         )
         print(result)
         
@@ -90,17 +218,22 @@ if __name__ == "__main__":
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = run("search_stack", search_stack, query=args.query, stack=args.stack, max_results=args.max_results)
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+    # Federated search across all domains
+    elif args.domain == FEDERATED_DOMAIN:
+        result = run("search_all", search_all, query=args.query, max_results=args.max_results, include_stacks=args.with_stacks)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = run("search", search, query=args.query, domain=args.domain, max_results=args.max_results)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
@@ -6,159 +6,804 @@ This script imports questions from JSON files created by the offline question en
 into the MCQ Study App database.
 
 Usage:
-    python import_questions.py <json_file_path>
+    python import_questions.py <json_file_path> [<json_file_path> ...]
     python import_questions.py questions.json
+    python import_questions.py questions.json --bulk --batch-size 1000
+    python import_questions.py questions.jsonl --bulk
+    python import_questions.py exports/ "archive/*.json" --bulk --workers 4
+    python import_questions.py exports/ --bulk --checkpoint   (save progress to import_checkpoint.json)
+    python import_questions.py exports/ --bulk --resume       (continue after a crash)
 
 Features:
 - Validates question format before import
-- Handles duplicate questions gracefully
+- Streams the input (a JSON array or JSON Lines) in bounded chunks, so memory
+  stays flat however large the file is
+- Handles duplicate questions gracefully (existing keys are preloaded in a few
+  queries; duplicates within the file are reported separately)
 - Provides detailed import statistics
-- Supports batch import of multiple files
+- Supports batch import of multiple files, directories and globs, in parallel
+  workers each with its own database session; a question found in several
+  files is imported from the first file in command-line order, or from the
+  next one holding it if its insert fails there (this needs one extra pass
+  over all files before the import starts)
+- Bulk mode: validates a chunk, then inserts its questions and answers with
+  one multi-row statement each (one round trip per chunk instead of per row)
+- Resumable: with --checkpoint, progress is saved after every committed
+  chunk, and --resume continues each file from its next uncommitted chunk
 """
 
+import argparse
+import glob
 import json
+import re
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 
 # Add the parent directory to Python path to import app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
 from app.database import SessionLocal
 from app import models, crud, schemas
 
 
-def validate_question_data(question_data: Dict[str, Any]) -> bool:
-    """Validate that question data has all required fields."""
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 1
+DEFAULT_CHECKPOINT = 'import_checkpoint.json'
+QUESTION_FILE_SUFFIXES = ('.json', '.jsonl')
+READ_SIZE = 1 << 16  # Characters read from the input file at a time
+
+_WHITESPACE = re.compile(r'\s*')
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+def question_error(question_data: Dict[str, Any]) -> Optional[str]:
+    """Return why question data is invalid, or None when it has all required fields."""
     required_fields = ['year', 'course', 'speciality', 'chapter', 'number', 'question_text', 'answers']
     
     for field in required_fields:
         if field not in question_data:
-            print(f"  ❌ Missing required field: {field}")
-            return False
+            return f"Missing required field: {field}"
     
     # Validate answers
     if not isinstance(question_data['answers'], list) or len(question_data['answers']) < 2:
-        print("  ❌ Must have at least 2 answers")
-        return False
-    
-    # Check if at least one answer is marked as correct
-    has_correct = any(answer.get('is_correct', False) for answer in question_data['answers'])
-    if not has_correct:
-        print("  ❌ Must have at least one correct answer")
-        return False
+        return "Must have at least 2 answers"
     
     # Validate answer structure
     for i, answer in enumerate(question_data['answers']):
         if not isinstance(answer, dict):
-            print(f"  ❌ Answer {i+1} is not a valid object")
-            return False
+            return f"Answer {i+1} is not a valid object"
         
         if 'answer_text' not in answer or 'option_label' not in answer:
-            print(f"  ❌ Answer {i+1} missing required fields")
-            return False
-        
+            return f"Answer {i+1} missing required fields"
+    
+    # Check if at least one answer is marked as correct
+    has_correct = any(answer.get('is_correct', False) for answer in question_data['answers'])
+    if not has_correct:
+        return "Must have at least one correct answer"
+    
+    return None
+
+
+def validate_question_data(question_data: Dict[str, Any]) -> bool:
+    """Validate that question data has all required fields."""
+    error = question_error(question_data)
+    if error:
+        print(f"  ❌ {error}")
+        return False
+    
+    for answer in question_data['answers']:
         if 'is_correct' not in answer:
             answer['is_correct'] = False  # Default to false if not specified
     
     return True
 
 
-def import_questions_from_file(file_path: str) -> Dict[str, int]:
-    """Import questions from a JSON file."""
+def build_question_create(question_data: Dict[str, Any]) -> schemas.QuestionCreate:
+    """
+    Build the schema crud.create_question takes from validated question data.
+    
+    Raises ValueError (the schema's validation error) or TypeError when the
+    schema rejects a value, e.g. an option label outside A-E.
+    """
+    return schemas.QuestionCreate(
+        year=question_data['year'],
+        course=question_data['course'],
+        speciality=question_data['speciality'],
+        chapter=question_data['chapter'],
+        number=question_data['number'],
+        question_text=question_data['question_text'],
+        answers=[
+            schemas.AnswerCreate(
+                answer_text=answer['answer_text'],
+                is_correct=answer.get('is_correct', False),
+                option_label=answer['option_label']
+            )
+            for answer in question_data['answers']
+        ]
+    )
+
+
+def importable_question(question_data: Any) -> Optional[schemas.QuestionCreate]:
+    """The QuestionCreate for question data that passes the import's validation, else None (nothing is printed)."""
+    if not isinstance(question_data, dict) or question_error(question_data) is not None:
+        return None
+    try:
+        return build_question_create(question_data)
+    except (ValueError, TypeError):
+        return None
+
+
+def question_key(question: schemas.QuestionCreate) -> Tuple[Any, Any, Any]:
+    """
+    Key identifying a question: (year, course, number).
+    
+    Taken from the schema's coerced values rather than the raw JSON, so that
+    e.g. "number": "2" and "number": 2 are the same question, as they are for
+    the database.
+    """
+    return question.year, question.course, question.number
+
+
+def fetch_existing_keys(db, keys: Iterable[Tuple[Any, Any, Any]]) -> Set[Tuple[Any, Any, Any]]:
+    """
+    Fetch which of the given (year, course, number) keys are already in the database.
+    
+    One query covers every key: it is restricted to the years, courses and
+    numbers that occur in them, so the result is a small superset of the keys
+    that can collide.
+    """
+    years, courses, numbers = set(), set(), set()
+    for year, course, number in keys:
+        years.add(year)
+        courses.add(course)
+        numbers.add(number)
+    if not years:
+        return set()
+    
+    rows = db.query(models.Question.year, models.Question.course, models.Question.number).filter(
+        models.Question.year.in_(years),
+        models.Question.course.in_(courses),
+        models.Question.number.in_(numbers)
+    ).all()
+    return {tuple(row) for row in rows}
+
+
+def check_duplicate(key: Tuple[Any, Any, Any], existing_keys: Set, file_keys: Set, stats: Dict[str, int],
+                    key_owners: Optional[Dict] = None, file_index: int = 0) -> Optional[str]:
+    """
+    Check a validated question's key against the database keys and the keys seen earlier in the file.
+    
+    Call it only once the question passed the schema, so that a rejected copy
+    never claims its key; the caller discards the key from file_keys again
+    when the insert fails, letting a later copy be imported.
+    
+    Returns the stats counter it was counted under ('skipped' for database
+    duplicates, 'duplicates_in_file' for repeats within the file, where the
+    first importable occurrence wins, 'duplicates_across_files' for keys that
+    key_owners assigns to a file before file_index), or None for a new question.
+    """
+    if key in file_keys:
+        duplicate = 'duplicates_in_file'
+    elif key_owners is not None and key_owners.get(key, file_index) < file_index:
+        duplicate = 'duplicates_across_files'
+    elif key in existing_keys:
+        duplicate = 'skipped'
+    else:
+        duplicate = None
+    file_keys.add(key)
+    if duplicate:
+        stats[duplicate] += 1
+    return duplicate
+
+
+def _iter_json_array(f) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time, reading the file in READ_SIZE pieces."""
+    decoder = json.JSONDecoder()
+    buffer, pos = '', 0
+    
+    def peek() -> str:
+        """Next non-whitespace character ('' at end of file), reading more input as needed."""
+        nonlocal buffer, pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            data = f.read(READ_SIZE)
+            if not data:
+                return ''
+            buffer, pos = data, 0
+    
+    if peek() != '[':
+        raise ValueError("JSON file must contain an array of questions")
+    pos += 1
+    if peek() == ']':
+        return
+    
+    count = 0
+    while True:
+        # Decode the next element, reading more input until it is complete
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                error = None
+                if end < len(buffer) and buffer[end] not in _NUMBER_CHARS:
+                    break  # Only a following delimiter proves a number was not cut off
+            except json.JSONDecodeError as e:
+                error = e
+            data = f.read(READ_SIZE)
+            if not data:
+                if error:
+                    raise ValueError(f"Invalid JSON format after question {count}: {error.msg}")
+                break
+            buffer, pos = buffer[pos:] + data, 0
+        
+        pos = end
+        count += 1
+        yield value
+        
+        separator = peek()
+        if separator == ']':
+            break
+        if separator != ',':
+            raise ValueError(f"Invalid JSON format: expected ',' or ']' after question {count}")
+        pos += 1
+    
+    pos += 1
+    if peek():
+        raise ValueError("Invalid JSON format: extra data after the array of questions")
+
+
+def _iter_json_lines(f) -> Iterator[Any]:
+    """Yield one question per non-blank line of a JSON Lines file."""
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON format on line {line_no}: {e}")
+
+
+def iter_questions(file_path: str) -> Iterator[Any]:
+    """
+    Stream the questions of a file without loading it whole.
+    
+    The file is either a JSON array of questions (detected by its leading '[')
+    or JSON Lines with one question object per line.
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    print(f"\n📁 Loading questions from: {file_path}")
-    
     with open(file_path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_json_lines(f)
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most size items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_question(db, question_data: Dict[str, Any], stats: Dict[str, int], existing_keys: Set, file_keys: Set,
+                    key_owners: Optional[Dict] = None, file_index: int = 0, stored_keys: Optional[Set] = None) -> bool:
+    """
+    Validate, check and import a single question through crud.create_question.
+    
+    Returns False when the question was valid and new but its insert failed,
+    True otherwise (imported, skipped or rejected by validation). The key of a
+    question that is now in the database (imported or already there) is added
+    to stored_keys when it is given.
+    """
+    # Validate question data
+    if not validate_question_data(question_data):
+        print(f"   ⚠️  Skipping invalid question")
+        stats['errors'] += 1
+        return True
+    
+    try:
+        # Create question schema
+        question_create = build_question_create(question_data)
+    except (ValueError, TypeError) as e:
+        print(f"   ❌ Invalid question: {e}")
+        stats['errors'] += 1
+        return True
+    
+    # Check for duplicate
+    key = question_key(question_create)
+    duplicate = check_duplicate(key, existing_keys, file_keys, stats, key_owners, file_index)
+    if duplicate == 'skipped':
+        print(f"   ⚠️  Question already exists, skipping")
+        if stored_keys is not None:
+            stored_keys.add(key)
+        return True
+    if duplicate == 'duplicates_across_files':
+        print(f"   ⚠️  Question is imported from an earlier file, skipping")
+        return True
+    if duplicate:
+        print(f"   ⚠️  Question repeats an earlier one in this file, skipping")
+        return True
+    
+    try:
+        # Import the question
+        imported_question = crud.create_question(db, question_create)
+        print(f"   ✅ Successfully imported (ID: {imported_question.id})")
+        stats['imported'] += 1
+        if stored_keys is not None:
+            stored_keys.add(key)
+        return True
+        
+    except Exception as e:
+        print(f"   ❌ Error importing question: {e}")
+        stats['errors'] += 1
+        db.rollback()
+        file_keys.discard(key)  # Not imported: a later copy in the file may be
+        return False
+
+
+def bulk_insert_questions(db, questions: List[schemas.QuestionCreate]) -> List[int]:
+    """
+    Insert schema-validated questions and their answers with one multi-row INSERT each.
+    
+    Question ids come back from INSERT ... RETURNING in input order and are used
+    as the answers' question_id. The caller commits or rolls back.
+    """
+    question_ids = db.execute(
+        insert(models.Question).returning(models.Question.id, sort_by_parameter_order=True),
+        [
+            {
+                'year': question.year,
+                'course': question.course,
+                'speciality': question.speciality,
+                'chapter': question.chapter,
+                'number': question.number,
+                'question_text': question.question_text,
+            }
+            for question in questions
+        ]
+    ).scalars().all()
+    
+    db.execute(
+        insert(models.Answer),
+        [
+            {
+                'question_id': question_id,
+                'answer_text': answer.answer_text,
+                'is_correct': answer.is_correct,
+                'option_label': answer.option_label,
+            }
+            for question_id, question in zip(question_ids, questions)
+            for answer in question.answers
+        ]
+    )
+    return question_ids
+
+
+def import_chunk(db, chunk: List[Dict[str, Any]], stats: Dict[str, int], file_keys: Set,
+                 key_owners: Optional[Dict] = None, file_index: int = 0,
+                 stored_keys: Optional[Set] = None) -> List[Tuple[Any, Any, Any]]:
+    """
+    Validate a chunk of questions, then bulk insert the new ones in one transaction.
+    
+    Each question is built into a schemas.QuestionCreate before the duplicate
+    check, exactly as the per-question path does, so a value the schema rejects
+    only fails that question. If the bulk insert still fails (e.g. a constraint
+    violation), the chunk is rolled back and retried one question at a time
+    through crud.create_question, so only the offending questions count as
+    errors; a later copy of a failed question in the chunk is tried in its
+    place. Errors that do not come from the database propagate.
+    
+    Returns the keys of the questions whose insert failed, so the caller knows
+    the chunk is not fully committed (empty when it is). Keys now in the
+    database (imported or already there) are added to stored_keys when given.
+    """
+    if stored_keys is None:
+        stored_keys = set()
+    valid = []
+    for question_data in chunk:
+        label = f"{question_data.get('course', 'Unknown')} - Q{question_data.get('number', '?')}"
+        if not validate_question_data(question_data):
+            print(f"   ⚠️  Skipping invalid question: {label}")
+            stats['errors'] += 1
+            continue
         try:
-            questions_data = json.load(f)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON format: {e}")
+            valid.append(build_question_create(question_data))
+        except (ValueError, TypeError) as e:
+            print(f"   ❌ Invalid question {label}: {e}")
+            stats['errors'] += 1
     
-    if not isinstance(questions_data, list):
-        raise ValueError("JSON file must contain an array of questions")
+    existing_keys = fetch_existing_keys(db, map(question_key, valid))
+    to_insert = []
+    repeats = {}  # key inserted by this chunk -> later copies in the chunk, tried if its insert fails
+    for question_create in valid:
+        key = question_key(question_create)
+        duplicate = check_duplicate(key, existing_keys, file_keys, stats, key_owners, file_index)
+        if not duplicate:
+            to_insert.append(question_create)
+            repeats[key] = []
+        elif duplicate == 'skipped':
+            stored_keys.add(key)
+        elif duplicate == 'duplicates_in_file' and key in repeats:
+            repeats[key].append(question_create)
+    
+    if not to_insert:
+        return []
+    
+    try:
+        bulk_insert_questions(db, to_insert)
+        db.commit()
+        stats['imported'] += len(to_insert)
+        stored_keys.update(repeats)
+        return []
+    except SQLAlchemyError as e:
+        # Only database errors (constraints, data errors): anything else is a bug and must not hide behind the retry
+        db.rollback()
+        print(f"   ⚠️  Bulk insert failed ({type(e).__name__}: {str(getattr(e, 'orig', None) or e)[:200]}), "
+              f"retrying the chunk one question at a time")
+    
+    failed_keys = []
+    for first in to_insert:
+        key = question_key(first)
+        for copy_number, question_create in enumerate([first] + repeats[key]):
+            if copy_number:
+                stats['duplicates_in_file'] -= 1  # The copy is imported (or fails) in place of the first one
+            try:
+                crud.create_question(db, question_create)
+                stats['imported'] += 1
+                stored_keys.add(key)
+                break
+            except Exception as e:
+                print(f"   ❌ Error importing question {question_create.course} - Q{question_create.number}: {e}")
+                stats['errors'] += 1
+                db.rollback()
+        else:
+            file_keys.discard(key)  # Not imported: a copy in a later chunk may be
+            failed_keys.append(key)
+    return failed_keys
+
+
+class ImportCheckpoint:
+    """
+    Progress of every input file, saved as JSON after each committed chunk.
+    
+    For each file (by absolute path) it records how many questions have been
+    processed, the stats so far, whether the file is done, and the file's size
+    and mtime so that a file changed since the checkpoint is imported again.
+    Safe to share between worker threads. Failing to save it (e.g. in a
+    read-only directory) only prints a warning: the import itself goes on.
+    """
     
-    print(f"📊 Found {len(questions_data)} questions in file")
+    def __init__(self, path: str):
+        self.path = path
+        self.files = {}
+        self.write_error = None
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                try:
+                    self.files = json.load(f).get('files', {})
+                except (json.JSONDecodeError, AttributeError):
+                    raise ValueError(f"Invalid checkpoint file: {path}")
     
+    @staticmethod
+    def _signature(file_path: str) -> Dict[str, int]:
+        stat = os.stat(file_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Return the checkpoint entry of a file, or None when there is none or the file has changed."""
+        entry = self.files.get(os.path.abspath(file_path))
+        if entry is None or not os.path.exists(file_path):
+            return None
+        signature = self._signature(file_path)
+        if any(entry.get(field) != value for field, value in signature.items()):
+            print(f"   ⚠️  {os.path.basename(file_path)} changed since the checkpoint, importing from the start")
+            return None
+        return entry
+    
+    def update(self, file_path: str, stats: Dict[str, int], done: bool = False):
+        """Record that the first stats['total'] questions of a file are committed, and save."""
+        with self._lock:
+            self.files[os.path.abspath(file_path)] = dict(
+                self._signature(file_path),
+                questions=stats['total'],
+                stats=dict(stats),
+                done=done,
+                updated=datetime.now().isoformat(timespec='seconds')
+            )
+            tmp_path = self.path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'files': self.files}, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                if self.write_error is None:
+                    print(f"   ⚠️  Could not save the checkpoint {self.path}: {e} (the import continues)")
+                self.write_error = str(e)
+
+
+def import_questions_from_file(file_path: str, bulk: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                               key_owners: Optional[Dict] = None, file_index: int = 0,
+                               checkpoint: Optional[ImportCheckpoint] = None, resume: bool = False,
+                               stored_keys: Optional[Set] = None) -> Dict[str, int]:
+    """
+    Import questions from a JSON or JSON Lines file.
+    
+    The file is streamed in chunks of batch_size questions, so only one chunk
+    (plus the keys of the questions seen so far) is held in memory. By default
+    every question goes through crud.create_question. With bulk=True each chunk
+    is validated and then inserted with multi-row statements and committed on
+    its own. Chunks before a malformed part of the file stay imported.
+    
+    When importing several files, key_owners (from assign_key_owners) maps each
+    question key to the index of the file it is imported from; questions whose
+    key belongs to a file before file_index are skipped. The keys of questions
+    now in the database (imported, already there, or committed before a resumed
+    checkpoint) are added to stored_keys when it is given; import_files uses it
+    to find keys their owner never stored.
+    
+    With a checkpoint, progress is saved after every chunk (in bulk mode each
+    chunk is one transaction). It stops advancing at the first chunk with a
+    question whose insert failed, and the file is then not marked done, so a
+    resumed import retries from that chunk. With resume=True as well, the
+    questions already recorded in the checkpoint are only re-read to restore
+    the duplicate tracking, and importing continues with the next uncommitted
+    chunk.
+    """
+    print(f"\n📁 Loading questions from: {file_path}")
+    entry = checkpoint.get(file_path) if checkpoint and resume else None
+    if entry and entry['done']:
+        print(f"⏩ Already imported according to the checkpoint, skipping")
+        if stored_keys is not None:
+            # A file is only marked done when every insert committed
+            stored_keys.update(question_key(question) for question in map(importable_question, iter_questions(file_path))
+                               if question)
+        return entry['stats']
+    
+    questions = iter_questions(file_path)
     db = SessionLocal()
     stats = {
-        'total': len(questions_data),
+        'total': 0,
         'imported': 0,
         'skipped': 0,
+        'duplicates_in_file': 0,
+        'duplicates_across_files': 0,
         'errors': 0
     }
+    file_keys = set()
     
     try:
-        for i, question_data in enumerate(questions_data, 1):
-            print(f"\n🔄 Processing question {i}/{len(questions_data)}")
-            print(f"   📝 {question_data.get('course', 'Unknown')} - Q{question_data.get('number', '?')}")
-            
-            # Validate question data
-            if not validate_question_data(question_data):
-                print(f"   ⚠️  Skipping invalid question")
-                stats['errors'] += 1
-                continue
-            
-            # Check for duplicate
-            existing = db.query(models.Question).filter(
-                models.Question.year == question_data['year'],
-                models.Question.course == question_data['course'],
-                models.Question.number == question_data['number']
-            ).first()
-            
-            if existing:
-                print(f"   ⚠️  Question already exists, skipping")
-                stats['skipped'] += 1
-                continue
-            
-            try:
-                # Create question schema
-                question_create = schemas.QuestionCreate(
-                    year=question_data['year'],
-                    course=question_data['course'],
-                    speciality=question_data['speciality'],
-                    chapter=question_data['chapter'],
-                    number=question_data['number'],
-                    question_text=question_data['question_text'],
-                    answers=[
-                        schemas.AnswerCreate(
-                            answer_text=answer['answer_text'],
-                            is_correct=answer.get('is_correct', False),
-                            option_label=answer['option_label']
-                        )
-                        for answer in question_data['answers']
-                    ]
-                )
-                
-                # Import the question
-                imported_question = crud.create_question(db, question_create)
-                print(f"   ✅ Successfully imported (ID: {imported_question.id})")
-                stats['imported'] += 1
-                
-            except Exception as e:
-                print(f"   ❌ Error importing question: {e}")
-                stats['errors'] += 1
-                db.rollback()
+        if entry:
+            stats.update(entry['stats'])
+            print(f"⏩ Resuming after question {stats['total']}")
+            for question_data in islice(questions, stats['total']):
+                question_create = importable_question(question_data)
+                if question_create:
+                    file_keys.add(question_key(question_create))
+                    if stored_keys is not None:
+                        stored_keys.add(question_key(question_create))  # The checkpoint never passes an uncommitted insert
+        
+        for chunk in iter_chunks(questions, batch_size):
+            start = stats['total']
+            stats['total'] += len(chunk)
+            if bulk:
+                print(f"\n🔄 Processing questions {start + 1}-{stats['total']}")
+                chunk_failed_keys = import_chunk(db, chunk, stats, file_keys, key_owners, file_index, stored_keys)
+                skipped = stats['skipped'] + stats['duplicates_in_file'] + stats['duplicates_across_files']
+                print(f"   📈 {os.path.basename(file_path)} - Imported: {stats['imported']} | Skipped: {skipped} | Errors: {stats['errors']}")
+            else:
+                existing_keys = fetch_existing_keys(
+                    db, [question_key(question) for question in map(importable_question, chunk) if question])
+                chunk_failed_keys = []
+                for i, question_data in enumerate(chunk, start + 1):
+                    print(f"\n🔄 Processing question {i}")
+                    print(f"   📝 {question_data.get('course', 'Unknown')} - Q{question_data.get('number', '?')}")
+                    if not import_question(db, question_data, stats, existing_keys, file_keys, key_owners, file_index,
+                                           stored_keys):
+                        chunk_failed_keys.append(question_key(importable_question(question_data)))
+            if checkpoint and chunk_failed_keys:
+                print(f"   ⚠️  {len(chunk_failed_keys)} question(s) not committed: the checkpoint stays at question {start}, "
+                      f"so --resume retries from there")
+                checkpoint = None  # Later chunks must not move it past the uncommitted ones
+            if checkpoint:
+                checkpoint.update(file_path, stats)
+        
+        if checkpoint:
+            checkpoint.update(file_path, stats, done=True)
     
     finally:
+        questions.close()
         db.close()
     
+    print(f"\n📊 Processed {stats['total']} questions from {os.path.basename(file_path)}")
     return stats
 
 
-def print_import_summary(stats: Dict[str, int], file_path: str):
+def expand_file_paths(paths: List[str]) -> List[str]:
+    """
+    Expand files, directories and glob patterns into a list of question files.
+    
+    Directories contribute their .json/.jsonl files and globs their matches,
+    each sorted by name; the overall order follows the arguments and decides
+    which file wins a duplicate question. Repeated paths are kept once.
+    """
+    file_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith(QUESTION_FILE_SUFFIXES) and os.path.isfile(os.path.join(path, name))
+            )
+        elif any(char in path for char in '*?['):
+            matches = sorted(match for match in glob.glob(path) if os.path.isfile(match))
+        else:
+            matches = [path]
+        for match in matches:
+            if match not in file_paths:
+                file_paths.append(match)
+    return file_paths
+
+
+def assign_key_owners(file_paths: List[str]) -> Tuple[Dict[Tuple[Any, Any, Any], int], Dict[Tuple[Any, Any, Any], List[int]]]:
+    """
+    Map every question key to the index of the first file holding a valid question with it.
+    
+    Returns (key_owners, later_holders), where later_holders lists, for keys
+    found in several files, the indices of the other files holding them in
+    order; import_files falls back to those when the owner's insert fails.
+    Parallel workers thus resolve questions present in several files the same
+    way whatever order they finish in. Unreadable parts of a file are left for
+    the import itself to report.
+    
+    The price is an extra full parse of every file, done on the calling thread
+    before any worker starts, and every key stays in memory for the whole
+    import. It is only needed when importing more than one file.
+    """
+    key_owners, later_holders = {}, {}
+    for index, file_path in enumerate(file_paths):
+        try:
+            for question_data in iter_questions(file_path):
+                question_create = importable_question(question_data)
+                if not question_create:
+                    continue
+                key = question_key(question_create)
+                owner = key_owners.setdefault(key, index)
+                if owner != index:
+                    holders = later_holders.setdefault(key, [])
+                    if not holders or holders[-1] != index:
+                        holders.append(index)
+        except (OSError, ValueError):
+            continue
+    return key_owners, later_holders
+
+
+def merge_stats(all_stats: List[Dict[str, int]]) -> Dict[str, int]:
+    """Sum per-file import statistics."""
+    merged = {}
+    for stats in all_stats:
+        for name, count in stats.items():
+            merged[name] = merged.get(name, 0) + count
+    return merged
+
+
+def import_files(file_paths: List[str], bulk: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = DEFAULT_WORKERS, checkpoint: Optional[ImportCheckpoint] = None,
+                 resume: bool = False) -> Tuple[Dict[str, Dict[str, int]], Dict[str, str]]:
+    """
+    Import several files on a pool of worker threads, one database session per file.
+    
+    With more than one file, assign_key_owners first decides which file each
+    question is imported from. Once all workers are done, every question its
+    file did not store (its insert failed, the file failed partway, or its
+    chunk was lost to malformed JSON) is imported from the next file holding it.
+    
+    Returns ({file_path: stats} for the files that were imported, in input
+    order, and {file_path: error message} for the files that failed).
+    """
+    key_owners, later_holders = assign_key_owners(file_paths) if len(file_paths) > 1 else (None, {})
+    stored_keys = [set() for _ in file_paths]
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(import_questions_from_file, file_path, bulk, batch_size, key_owners, index, checkpoint, resume,
+                        stored_keys[index])
+            for index, file_path in enumerate(file_paths)
+        ]
+        results, failures = {}, {}
+        for file_path, future in zip(file_paths, futures):
+            try:
+                results[file_path] = future.result()
+            except Exception as e:
+                failures[file_path] = str(e)
+    
+    # Keys their owner did not store: try the later files holding them, in order
+    pending = {key: holders for key, holders in later_holders.items() if key not in stored_keys[key_owners[key]]}
+    while pending:
+        by_file = {}
+        for key, holders in pending.items():
+            by_file.setdefault(holders[0], set()).add(key)
+        pending = {key: holders[1:] for key, holders in pending.items() if len(holders) > 1}
+        for index in sorted(by_file):
+            file_path = file_paths[index]
+            if file_path not in results:
+                continue  # The file itself failed; its keys are already moving on to their next holder
+            for key in import_fallback_questions(file_path, by_file[index], results[file_path]):
+                pending.pop(key, None)
+    
+    return results, failures
+
+
+def import_fallback_questions(file_path: str, keys: Set, stats: Dict[str, int]) -> Set:
+    """
+    Import, from a later file, questions the file that owned their key did not store.
+    
+    The first importable occurrence of each key in the file was counted under
+    'duplicates_across_files'; it is now imported and counted as such in stats.
+    Returns the keys that are now handled (imported, or already in the database).
+    """
+    print(f"\n🔁 Importing {len(keys)} question(s) from {os.path.basename(file_path)} that an earlier file did not import")
+    questions, found = [], set()
+    try:
+        for question_data in iter_questions(file_path):
+            question_create = importable_question(question_data)
+            if question_create:
+                key = question_key(question_create)
+                if key in keys and key not in found:
+                    found.add(key)
+                    questions.append((key, question_data))
+    except (OSError, ValueError) as e:
+        print(f"   ❌ Could not read {file_path}: {e}")
+    
+    handled = set()
+    db = SessionLocal()
+    try:
+        existing_keys = fetch_existing_keys(db, [key for key, _ in questions])
+        for key, question_data in questions:
+            stats['duplicates_across_files'] -= 1
+            print(f"   📝 {question_data['course']} - Q{question_data['number']}")
+            errors = stats['errors']
+            if import_question(db, question_data, stats, existing_keys, set()) and stats['errors'] == errors:
+                handled.add(key)
+    finally:
+        db.close()
+    return handled
+
+
+def print_import_summary(stats: Dict[str, int], file_path: str, title: str = "IMPORT SUMMARY"):
     """Print a summary of the import operation."""
     print("\n" + "="*60)
-    print("📊 IMPORT SUMMARY")
+    print(f"📊 {title}")
     print("="*60)
     print(f"📁 File: {os.path.basename(file_path)}")
     print(f"📅 Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"📈 Total questions in file: {stats['total']}")
     print(f"✅ Successfully imported: {stats['imported']}")
-    print(f"⚠️  Skipped (duplicates): {stats['skipped']}")
+    print(f"⚠️  Skipped (already in database): {stats['skipped']}")
+    print(f"🔁 Skipped (duplicates within file): {stats['duplicates_in_file']}")
+    if stats.get('duplicates_across_files'):
+        print(f"🔀 Skipped (imported from an earlier file): {stats['duplicates_across_files']}")
     print(f"❌ Errors: {stats['errors']}")
     
     if stats['imported'] > 0:
@@ -172,26 +817,47 @@ def print_import_summary(stats: Dict[str, int], file_path: str):
 
 def main():
     """Main function."""
-    if len(sys.argv) != 2:
-        print("Usage: python import_questions.py <json_file_path>")
-        print("Example: python import_questions.py questions.json")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Import MCQ questions from JSON or JSON Lines files")
+    parser.add_argument("file_paths", nargs="+", help="Question files (JSON array or JSON Lines), directories or glob patterns")
+    parser.add_argument("--bulk", action="store_true", help="Insert questions in multi-row batches (much faster for large files)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Questions read, checked and (with --bulk) inserted per chunk (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", "-w", type=int, default=DEFAULT_WORKERS, help=f"Files imported in parallel, each with its own session (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--checkpoint", nargs="?", const=DEFAULT_CHECKPOINT, default=None, metavar="PATH", help=f"Save progress to PATH after every committed chunk (default PATH: {DEFAULT_CHECKPOINT}; off unless given)")
+    parser.add_argument("--resume", action="store_true", help=f"Continue each file after the last chunk recorded in the checkpoint (uses {DEFAULT_CHECKPOINT} unless --checkpoint names another file)")
+    args = parser.parse_args()
     
-    file_path = sys.argv[1]
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    file_paths = expand_file_paths(args.file_paths)
+    if not file_paths:
+        parser.error("no question files found")
     
     print("🚀 MCQ Questions Import Tool")
     print("="*40)
     
+    checkpoint_path = args.checkpoint or (DEFAULT_CHECKPOINT if args.resume else None)
     try:
-        stats = import_questions_from_file(file_path)
-        print_import_summary(stats, file_path)
-        
-        if stats['errors'] > 0:
-            sys.exit(1)
-            
-    except Exception as e:
+        checkpoint = ImportCheckpoint(checkpoint_path) if checkpoint_path else None
+    except ValueError as e:
         print(f"\n❌ Import failed: {e}")
         sys.exit(1)
+    
+    results, failures = import_files(file_paths, bulk=args.bulk, batch_size=args.batch_size, workers=args.workers,
+                                     checkpoint=checkpoint, resume=args.resume)
+    
+    for file_path, stats in results.items():
+        print_import_summary(stats, file_path)
+    if len(results) > 1:
+        print_import_summary(merge_stats(list(results.values())), f"{len(results)} of {len(file_paths)} files",
+                             "OVERALL IMPORT SUMMARY")
+    for file_path, error in failures.items():
+        print(f"\n❌ Import failed for {file_path}: {error}")
+    
+    if failures or any(stats['errors'] > 0 for stats in results.values()):
+        sys.exit(1)
 
 
 if __name__ == "__main__":